@@ -94,6 +94,7 @@ DATABASES = {
         "NAME": BASE_DIR / "db.sqlite3",
     }
 }
+DB_BULK_CHUNK_SIZE = int(os.getenv("DB_BULK_CHUNK_SIZE", 2000))  # rows written per bulk upsert statement
 
 
 # Password validation
@@ -161,7 +162,48 @@ LOGGING = {
 SECRETS_DIR_NAME = os.getenv("SECRETS_DIR_NAME", "secrets")
 SECRETS_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", SECRETS_DIR_NAME))
 
+CACHE_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", os.getenv("CACHE_DIR_NAME", "cache")))
+GOOGLE_DISCOVERY_CACHE_DIR = os.path.join(CACHE_DIR, "discovery")
+
 MAX_EXPORT_AGE_DAYS = int(os.getenv("MAX_EXPORT_AGE_DAYS", 1))
+MAX_CRAWL_EXPORT_AGE_DAYS = int(os.getenv("MAX_CRAWL_EXPORT_AGE_DAYS", 7))  # list crawls and page fetches, also refreshed when their urls change
+EXPORT_STORE_FORMAT = os.getenv("EXPORT_STORE_FORMAT", "arrow")  # arrow, parquet or csv
+# Maximum number of exports of each source running at the same time
+EXPORT_SOURCE_CONCURRENCY = {
+    "google_api": int(os.getenv("GOOGLE_API_EXPORT_CONCURRENCY", 4)),
+    "docker": int(os.getenv("DOCKER_EXPORT_CONCURRENCY", 2)),
+    "browser": int(os.getenv("BROWSER_EXPORT_CONCURRENCY", 1)),
+    "manual": 1,  # manual exports prompt on the console
+    "default": int(os.getenv("DEFAULT_EXPORT_CONCURRENCY", 2)),
+}
+CSV_MAX_WORKERS = int(os.getenv("CSV_MAX_WORKERS", 4))  # export CSV files parsed at the same time
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_MB", 2048)) * 1024 * 1024
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", 0))  # 0 sizes the pool from the cpu count and available memory
+BROWSER_PAGE_TIMEOUT = int(os.getenv("BROWSER_PAGE_TIMEOUT", 60))  # seconds
+BROWSER_TASK_TIMEOUT = int(os.getenv("BROWSER_TASK_TIMEOUT", 180))  # seconds a pool worker may spend on one page before it is replaced
+# Resource types (image, font, media, style, script) and hosts the browser does not load; subdomains of a host are blocked too
+BROWSER_BLOCKED_RESOURCES = [resource for resource in os.getenv("BROWSER_BLOCKED_RESOURCES", "image,font,media").split(",") if resource]
+BROWSER_BLOCKED_HOSTS = [host for host in os.getenv("BROWSER_BLOCKED_HOSTS", "google-analytics.com,googletagmanager.com,doubleclick.net,googlesyndication.com,facebook.net,hotjar.com,clarity.ms").split(",") if host]
+HTTP_MAX_WORKERS = int(os.getenv("HTTP_MAX_WORKERS", 8))  # concurrent conditional requests deciding which pages need a new render
+HTTP_TIMEOUT = int(os.getenv("HTTP_TIMEOUT", 30))  # seconds
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")  # skips resolving ChromeDriver through webdriver-manager
+
+GA_MAX_WORKERS = int(os.getenv("GA_MAX_WORKERS", 4))  # concurrent GA4 batchRunReports requests per fetch
+GSC_MAX_WORKERS = int(os.getenv("GSC_MAX_WORKERS", 4))  # concurrent Search Analytics requests per sharded fetch
+GSC_SHARD_UNIT = os.getenv("GSC_SHARD_UNIT", "week")  # day or week
+GSC_CHUNK_SIZE = int(os.getenv("GSC_CHUNK_SIZE", 100000))  # decoded GSC rows held in memory before a chunk is handed on
+GSC_REFETCH_DAYS = int(os.getenv("GSC_REFETCH_DAYS", 4))  # GSC day partitions fetched within this many days of their date are fetched again
 
 SCREAMINGFROG_IMAGE_NAME = os.getenv("DOCKER_IMAGE_NAME", "screamingfrog")
 SCREAMINGFROG_IMAGE_TAG = os.getenv("SEO_SPIDER_VERSION", "latest")
+SCREAMINGFROG_MAX_CONTAINERS = int(os.getenv("SCREAMINGFROG_MAX_CONTAINERS", 2))  # crawl containers running at once
+SCREAMINGFROG_CONTAINER_CPUS = float(os.getenv("SCREAMINGFROG_CONTAINER_CPUS", 2))
+SCREAMINGFROG_CONTAINER_MEMORY = os.getenv("SCREAMINGFROG_CONTAINER_MEMORY", "4g")  # docker memory limit per crawl container
+SCREAMINGFROG_TIMEOUT = int(os.getenv("SCREAMINGFROG_TIMEOUT", 4 * 60 * 60))  # seconds before a crawl container is killed
+SCREAMINGFROG_STALL_TIMEOUT = int(os.getenv("SCREAMINGFROG_STALL_TIMEOUT", 15 * 60))  # seconds without crawl progress before a crawl container is killed
+SCREAMINGFROG_POOL_SIZE = int(os.getenv("SCREAMINGFROG_POOL_SIZE", 0))  # warm containers crawls are exec'd in; 0 runs every crawl in a new container
+SCREAMINGFROG_POOL_MAX_JOBS = int(os.getenv("SCREAMINGFROG_POOL_MAX_JOBS", 20))  # crawls before a warm container is replaced
+SCREAMINGFROG_LIST_CRAWL_SHARDS = int(os.getenv("SCREAMINGFROG_LIST_CRAWL_SHARDS", 1))  # containers a list crawl is split across
+# Hosts stay in one shard so they are not crawled faster than the crawl config allows; splitting them trades that for speed
+SCREAMINGFROG_LIST_CRAWL_SPLIT_HOSTS = os.getenv("SCREAMINGFROG_LIST_CRAWL_SPLIT_HOSTS", "false").lower() == "true"
@@ -1,31 +1,49 @@
+import hashlib
+import json
 import logging
 import os
 import shutil
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 from django.conf import settings
 
+from domain.export.export_manifest import ExportManifest
+from domain.export.store.export_store_manager import ExportStoreManager
+from domain.export.url_dictionary import UrlDictionary
 from model.core.project.models import ProjectModel
 from operators.dataframe_operator import DataFrameOperator
+from operators.url_operator import UrlOperator
 
 logger = logging.getLogger(__name__)
 
 
 class BaseExport(ABC):
+    _SCHEMA: Dict[str, str] = {}  # column dtypes enforced when the export is stored
+    _STORE_FORMAT: str = settings.EXPORT_STORE_FORMAT
+    _MAX_AGE_DAYS: Optional[int] = None  # falls back to settings.MAX_EXPORT_AGE_DAYS
+    SOURCE: str = "default"  # key into settings.EXPORT_SOURCE_CONCURRENCY
+    _CSV_COLUMNS: Optional[List[str]] = None  # columns read from the export's CSV files, None reads all of them
+    _CSV_CATEGORIES: List[str] = []  # low-cardinality CSV columns stored as categoricals
+    _URL_COLUMN: Optional[str] = None  # column holding the export's urls; adds their integer URL_ID from the url dictionary
 
     def __init__(self, project: ProjectModel, **kwargs: Any):
         self.project = project
         self.kwargs = kwargs
+        self.store = ExportStoreManager.get_store(self._STORE_FORMAT)
 
         self._data = pd.DataFrame()
         self._temp_data = pd.DataFrame()
+        self._fetch_duration = 0.0
 
         # Set up paths for temporary data and final export
-        self.temp_dir = os.path.join(project.data_folder, "temp")
-        self.save_path = os.path.join(project.data_folder, "exports", self.export_name + ".csv")
+        # Each export gets its own temp directory so exports can run side by side
+        self.temp_dir = os.path.join(project.data_folder, "temp", self.export_name)
+        self.save_path = os.path.join(project.data_folder, "exports", f"{self.export_name}.{self.store.extension}")
+        self.manifest_path = f"{self.save_path}.manifest.json"
 
         # Ensure temp and export directories exist
         os.makedirs(self.temp_dir, exist_ok=True)
@@ -43,6 +61,37 @@ class BaseExport(ABC):
         """Flag to indicate if the export requires manual intervention."""
         pass
 
+    @property
+    def schema(self) -> Dict[str, str]:
+        """Column dtypes declared for the export."""
+        if self._URL_COLUMN:
+            return {**self._SCHEMA, "URL_ID": "Int64"}
+        return self._SCHEMA
+
+    @property
+    def max_age_days(self) -> int:
+        """Number of days a stored export stays fresh when its inputs did not change."""
+        return self._MAX_AGE_DAYS if self._MAX_AGE_DAYS is not None else settings.MAX_EXPORT_AGE_DAYS
+
+    def _fingerprint_inputs(self) -> Dict[str, Any]:
+        """Inputs that determine the export's content. Subclasses extend this with their own parameters."""
+        kwargs = {}
+        for key, value in self.kwargs.items():
+            # Order and duplicates in url lists do not change the result
+            if isinstance(value, (list, tuple, set)):
+                value = sorted(set(str(item) for item in value))
+            kwargs[key] = value
+        return {
+            "export_name": self.export_name,
+            "schema": self.schema,
+            "kwargs": kwargs,
+        }
+
+    @property
+    def fingerprint(self) -> str:
+        serialized_inputs = json.dumps(self._fingerprint_inputs(), sort_keys=True, default=str)
+        return hashlib.sha256(serialized_inputs.encode("utf-8")).hexdigest()
+
     def _empty_temp_dir(self) -> None:
         """Empty the temporary directory."""
         for filename in os.listdir(self.temp_dir):
@@ -57,6 +106,10 @@ class BaseExport(ABC):
             except Exception as e:
                 logger.error(f"Failed to delete {file_path}. Reason: {e}")
 
+    def _merge_csv(self, directory: str) -> pd.DataFrame:
+        """Read the CSV files of the export with its declared columns, dtypes and categories."""
+        return DataFrameOperator.merge_csv(directory, usecols=self._CSV_COLUMNS, dtype=self.schema, categories=self._CSV_CATEGORIES)
+
     @abstractmethod
     def _cleanup(self) -> None:
         """perform cleanup."""
@@ -77,29 +130,50 @@ class BaseExport(ABC):
         """Finalize and possibly transform self._temp_data post-export."""
         pass
 
+    def _add_url_ids(self) -> None:
+        """Add the integer URL_ID of every url, so reports can join exports on integers; fragmented urls get none."""
+        if self._URL_COLUMN and self._URL_COLUMN in self._temp_data.columns:
+            urls = self._temp_data[self._URL_COLUMN]
+            # Fragmented urls never make it into a report, so they are not registered as urls
+            self._temp_data["URL_ID"] = UrlDictionary.for_project(self.project).get_ids(urls.where(~UrlOperator.is_fragmented(urls)))
+
     def _save(self) -> None:
-        """Save the finalized data to a CSV file in the export directory."""
+        """Save the finalized data to the export store."""
         if not self._temp_data.empty:
-            self._temp_data.to_csv(self.save_path, index=False)
+            self.store.save(self._temp_data, self.save_path, self.schema)
+            manifest = ExportManifest(
+                export_name=self.export_name,
+                fingerprint=self.fingerprint,
+                row_count=len(self._temp_data),
+                byte_size=os.path.getsize(self.save_path),
+                fetch_duration=self._fetch_duration,
+            )
+            manifest.save(self.manifest_path)
         else:
             print(f"No data to save for '{self.export_name}' export.")
 
-    @staticmethod
-    def _needs_refresh(filepath: str, max_age_days: int = settings.MAX_EXPORT_AGE_DAYS) -> bool:
-        last_modified = datetime.fromtimestamp(os.path.getmtime(filepath))
-        logger.info(f"Last modified time of the file {filepath}: {last_modified}")
-        cutoff = datetime.now() - timedelta(days=max_age_days)
-        logger.info(f"Cutoff time: {cutoff}")
-        is_refresh_needed = last_modified < cutoff
+    def _needs_refresh(self) -> bool:
+        """Refresh when the export inputs changed since the stored run or the stored data is older than max_age_days."""
+        manifest = ExportManifest.load(self.manifest_path)
+        if manifest is None:
+            logger.info(f"No manifest found for {self.save_path}; it needs to be refreshed.")
+            return True
+        if manifest.fingerprint != self.fingerprint:
+            logger.info(f"Inputs of {self.export_name} changed since {manifest.created_at}; it needs to be refreshed.")
+            return True
+        cutoff = datetime.now() - timedelta(days=self.max_age_days)
+        logger.info(f"Stored at {manifest.created_at} ({manifest.row_count} rows, fetched in {manifest.fetch_duration:.1f}s), cutoff time: {cutoff}")
+        is_refresh_needed = manifest.created_at < cutoff
         if is_refresh_needed:
-            logger.info(f"File {filepath} needs to be refreshed.")
+            logger.info(f"File {self.save_path} needs to be refreshed.")
         else:
-            logger.info(f"File {filepath} does not need to be refreshed.")
+            logger.info(f"File {self.save_path} does not need to be refreshed.")
         return is_refresh_needed
 
     def _run(self) -> None:
         """Orchestrate the export process by calling the defined methods in order."""
         logger.info("Starting the export process.")
+        started_at = time.monotonic()
         self._cleanup()
         logger.info("Cleanup completed.")
         self._prepare()
@@ -110,13 +184,15 @@ class BaseExport(ABC):
             input("Please follow the above instructions to perform the manual export. Press Enter to continue after you're done...")
         if self._temp_data.empty:
             try:
-                self._temp_data = DataFrameOperator.merge_csv(self.temp_dir)
+                self._temp_data = self._merge_csv(self.temp_dir)
                 logger.info("Merged CSV files from temp directory.")
             except Exception as e:
                 logger.error(f"Failed to load CSV files from temp directory: {e}")
                 return  # or handle the error as appropriate
         self._finalize()
         logger.info("Finalization completed.")
+        self._add_url_ids()
+        self._fetch_duration = time.monotonic() - started_at
         self._save()
         logger.info("Data saved.")
         self._cleanup()
@@ -131,19 +207,19 @@ class BaseExport(ABC):
 
         if os.path.exists(self.save_path):
             logger.info(f"Checking if data at {self.save_path} needs to be refreshed.")
-            needs_refresh = self._needs_refresh(self.save_path)
+            needs_refresh = self._needs_refresh()
             if not needs_refresh:
                 logger.info("Data does not need to be refreshed. Loading data from file.")
                 try:
-                    self._data = pd.read_csv(self.save_path)
+                    self._data = self.store.load(self.save_path, self.schema)
                     logger.info("Data loaded successfully.")
                     return self._data
                 except Exception as e:
                     logger.error(f"Failed to load data from {self.save_path}: {e}")
             else:
-                logger.info("The existing data file is considered old. Refreshing data...")
+                logger.info("The existing data file is outdated. Refreshing data...")
 
         self._run()
-        self._data = pd.read_csv(self.save_path)
+        self._data = self.store.load(self.save_path, self.schema)
         logger.info("Data refreshed and loaded successfully.")
         return self._data
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[int, str, str]
+
+
+class ExportCache:
+    """Process-wide LRU cache of loaded export DataFrames, bounded by their in-memory size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._current_bytes = 0
+        # Loads in progress, so threads asking for the same export wait for one load instead of running it again
+        self._in_flight: Dict[CacheKey, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(project_id: int, export_type: str, kwargs: Dict[str, Any]) -> CacheKey:
+        """Build a cache key from the project, the export type and a hash of the export kwargs."""
+        serialized_kwargs = json.dumps(kwargs, sort_keys=True, default=str)
+        kwargs_hash = hashlib.sha1(serialized_kwargs.encode("utf-8")).hexdigest()
+        return project_id, export_type, kwargs_hash
+
+    def get(self, key: CacheKey) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Deep copy, so callers changing values or dropping rows in place never alter the cached frame
+        return entry[0].copy()
+
+    def get_or_load(self, key: CacheKey, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Return the cached frame, or load it once however many threads ask for the key at the same time."""
+        with self._lock:
+            # Checked under the lock, so a load finishing meanwhile is not started again
+            in_flight = self._in_flight.get(key)
+            is_loader = in_flight is None and key not in self._entries
+            if is_loader:
+                in_flight = self._in_flight[key] = Future()
+                self.misses += 1
+        if in_flight is None:
+            cached_data = self.get(key)
+            if cached_data is not None:
+                logger.info(f"[export cache hit] {key[1]}")
+                return cached_data
+            # Evicted in between; load it like a miss
+            return self.get_or_load(key, loader)
+        if not is_loader:
+            logger.info(f"[export cache] waiting for the running load of {key[1]}")
+            # Re-raises the loader's exception when the load failed
+            return in_flight.result().copy()
+
+        try:
+            data = loader()
+            self.put(key, data)
+            in_flight.set_result(data)
+        except BaseException as e:
+            in_flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return data.copy()
+
+    def put(self, key: CacheKey, data: pd.DataFrame) -> None:
+        size = int(data.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            logger.info(f"[export cache] {key[1]} is {size} bytes, larger than the {self.max_bytes} byte budget; not cached")
+            return
+        with self._lock:
+            if key in self._entries:
+                self._current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (data, size)
+            self._current_bytes += size
+            while self._current_bytes > self.max_bytes:
+                evicted_key, (_, evicted_size) = self._entries.popitem(last=False)
+                self._current_bytes -= evicted_size
+                self.evictions += 1
+                logger.info(f"[export cache] evicted {evicted_key[1]} ({evicted_size} bytes)")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+            }
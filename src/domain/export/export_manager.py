@@ -1,9 +1,12 @@
 import logging
-from typing import Any, Dict, Type
+from typing import Any, Dict, List, Type
 
 import pandas as pd
+from django.conf import settings
 
 from domain.export.base_export import BaseExport
+from domain.export.export_cache import ExportCache
+from domain.export.export_scheduler import ExportJob, ExportScheduler
 from domain.export.googleanalytics.googleanalytics_months_14_to_0_export import GoogleAnalyticsMonths14To0Export
 from domain.export.googlesearchconsole.googleasearchconsole_page_months_16_to_0_export import GoogleSearchConsolePageMonths16To0Export
 from domain.export.googlesearchconsole.googleasearchconsole_query_page_months_16_to_1_export import GoogleSearchConsoleQueryPageMonths16To1Export
@@ -41,15 +44,28 @@ class ExportManager:
         # Add more exports as needed
     }
 
+    # Shared by every ExportManager in the process, so reports reuse each other's loaded exports
+    shared_cache = ExportCache(settings.EXPORT_CACHE_MAX_BYTES)
+
     def __init__(self, project: ProjectModel):
         self.project = project
 
     def get_data(self, export_type: str, **kwargs: Any) -> pd.DataFrame:
         # Check if the requested export type is available
         if export_type in self.AVAILABLE_EXPORTS:
-            # Instantiate the export class with the project and any additional kwargs
-            export_instance = self.AVAILABLE_EXPORTS[export_type](self.project, **kwargs)
-            # Run the export
-            return export_instance.get_data()
+            cache_key = self.shared_cache.make_key(self.project.id, export_type, kwargs)
+            # Instantiate the export class with the project and any additional kwargs, and run it, unless the export
+            # is cached or already being loaded for another report
+            return self.shared_cache.get_or_load(cache_key, lambda: self.AVAILABLE_EXPORTS[export_type](self.project, **kwargs).get_data())
+        else:
+            raise ValueError(f"Export type '{export_type}' is not available.")
+
+    def get_source(self, export_type: str) -> str:
+        if export_type in self.AVAILABLE_EXPORTS:
+            return self.AVAILABLE_EXPORTS[export_type].SOURCE
         else:
             raise ValueError(f"Export type '{export_type}' is not available.")
+
+    def get_data_many(self, jobs: List[ExportJob]) -> Dict[str, pd.DataFrame]:
+        """Run a set of export jobs concurrently, honouring their dependencies, and return the data by job name."""
+        return ExportScheduler(self).run(jobs)
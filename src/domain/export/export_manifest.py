@@ -0,0 +1,54 @@
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExportManifest:
+    """Sidecar record describing the inputs and outcome of a stored export."""
+
+    def __init__(self, export_name: str, fingerprint: str, row_count: int, byte_size: int, fetch_duration: float, created_at: Optional[datetime] = None):
+        self.export_name = export_name
+        self.fingerprint = fingerprint
+        self.row_count = row_count
+        self.byte_size = byte_size
+        self.fetch_duration = fetch_duration  # seconds
+        self.created_at = created_at or datetime.now()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "export_name": self.export_name,
+            "fingerprint": self.fingerprint,
+            "row_count": self.row_count,
+            "byte_size": self.byte_size,
+            "fetch_duration": self.fetch_duration,
+            "created_at": self.created_at.isoformat(),
+        }
+
+    def save(self, path: str) -> None:
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ExportManifest"]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            return cls(
+                export_name=data["export_name"],
+                fingerprint=data["fingerprint"],
+                row_count=data["row_count"],
+                byte_size=data["byte_size"],
+                fetch_duration=data["fetch_duration"],
+                created_at=datetime.fromisoformat(data["created_at"]),
+            )
+        except (ValueError, KeyError) as e:
+            logger.error(f"Failed to read export manifest {path}: {e}")
+            return None
@@ -0,0 +1,132 @@
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+import pandas as pd
+from django.conf import settings
+from django.db import connection
+
+if TYPE_CHECKING:
+    from domain.export.export_manager import ExportManager
+
+logger = logging.getLogger(__name__)
+
+
+class ExportJob:
+    """An export to run, the jobs it waits for and how to derive its kwargs from their results."""
+
+    def __init__(
+        self,
+        export_type: str,
+        kwargs: Optional[Dict[str, Any]] = None,
+        depends_on: Optional[List[str]] = None,
+        kwargs_factory: Optional[Callable[[Dict[str, pd.DataFrame]], Dict[str, Any]]] = None,
+        name: Optional[str] = None,
+    ):
+        self.export_type = export_type
+        self.name = name or export_type
+        self.kwargs = kwargs or {}
+        self.depends_on = depends_on or []
+        self.kwargs_factory = kwargs_factory
+
+    def build_kwargs(self, results: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+        kwargs = dict(self.kwargs)
+        if self.kwargs_factory:
+            kwargs.update(self.kwargs_factory(results))
+        return kwargs
+
+
+class ExportScheduler:
+    """Run a graph of export jobs on a thread pool, starting each job as soon as its dependencies are done."""
+
+    # Shared by every scheduler so the per-source limits hold across reports and projects
+    _source_limits: Dict[str, threading.BoundedSemaphore] = {}
+    _source_limits_lock = threading.Lock()
+
+    def __init__(self, export_manager: "ExportManager"):
+        self.export_manager = export_manager
+        # Set on the first failure so jobs still waiting for their source slot do not start
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def _get_source_limit(cls, source: str) -> threading.BoundedSemaphore:
+        with cls._source_limits_lock:
+            if source not in cls._source_limits:
+                limit = settings.EXPORT_SOURCE_CONCURRENCY.get(source, settings.EXPORT_SOURCE_CONCURRENCY["default"])
+                cls._source_limits[source] = threading.BoundedSemaphore(limit)
+            return cls._source_limits[source]
+
+    @staticmethod
+    def _validate(jobs: List[ExportJob]) -> None:
+        names = [job.name for job in jobs]
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate export jobs: {sorted(duplicates)}")
+        for job in jobs:
+            missing = set(job.depends_on) - set(names)
+            if missing:
+                raise ValueError(f"Export job '{job.name}' depends on unknown jobs: {sorted(missing)}")
+
+        # Kahn's algorithm; whatever cannot be ordered is part of a cycle
+        remaining = {job.name: set(job.depends_on) for job in jobs}
+        while remaining:
+            ready = [name for name, dependencies in remaining.items() if not dependencies]
+            if not ready:
+                raise ValueError(f"Export jobs have a dependency cycle: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for dependencies in remaining.values():
+                dependencies.difference_update(ready)
+
+    def _run_job(self, job: ExportJob, kwargs: Dict[str, Any]) -> pd.DataFrame:
+        source = self.export_manager.get_source(job.export_type)
+        with self._get_source_limit(source):
+            if self._cancelled.is_set():
+                raise CancelledError(f"Export job '{job.name}' was cancelled after another job failed")
+            logger.info(f"[export started] {job.name} ({source})")
+            try:
+                data = self.export_manager.get_data(job.export_type, **kwargs)
+            finally:
+                # Worker threads open their own database connections; do not leave them behind
+                connection.close()
+            logger.info(f"[export finished] {job.name}")
+            return data
+
+    def _run_tracked(self, job: ExportJob, get_result: Callable[[], pd.DataFrame], running: Dict[Future, ExportJob]) -> pd.DataFrame:
+        """Return the result of a job; on failure cancel the jobs that have not started and re-raise."""
+        try:
+            return get_result()
+        except Exception as e:
+            logger.error(f"Export job '{job.name}' failed: {e}")
+            self._cancelled.set()
+            for future in running:
+                future.cancel()
+            raise
+
+    def run(self, jobs: List[ExportJob]) -> Dict[str, pd.DataFrame]:
+        self._validate(jobs)
+        results: Dict[str, pd.DataFrame] = {}
+        pending = {job.name: job for job in jobs}
+        running: Dict[Future, ExportJob] = {}
+        max_workers = sum(settings.EXPORT_SOURCE_CONCURRENCY.values())
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export") as executor:
+            while pending or running:
+                ready = [job for job in pending.values() if all(dependency in results for dependency in job.depends_on)]
+                # Manual exports prompt on the console; they run on this thread, one at a time. Those without dependencies
+                # all run before the pool starts, so their prompts are not mixed with the logs of running exports
+                for job in [job for job in ready if self.export_manager.get_source(job.export_type) == "manual"]:
+                    del pending[job.name]
+                    results[job.name] = self._run_tracked(job, lambda: self._run_job(job, job.build_kwargs(results)), running)
+                for job in [job for job in ready if job.name in pending]:
+                    del pending[job.name]
+                    running[executor.submit(self._run_job, job, job.build_kwargs(results))] = job
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    results[job.name] = self._run_tracked(job, future.result, running)
+        return results
@@ -1,14 +1,14 @@
 import logging
 from abc import abstractmethod
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Dict
 
 from dateutil.relativedelta import relativedelta
 
 from domain.export.base_export import BaseExport
 from model.core.project.models import ProjectModel
-from model.core.url.models import UrlModelManager
 from operators.google_analytics_operator import GoogleAnalyticsOperator
+from operators.url_operator import UrlOperator
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +28,23 @@ class BaseGoogleAnalyticsExport(BaseExport):
         {"name": "totalRevenue"},
         {"name": "conversions"},
     ]
+    _SCHEMA: Dict[str, str] = {
+        "pagePath": "string",
+        "sessionDefaultChannelGrouping": "category",
+        "sessions": "Int64",
+        "activeUsers": "Int64",
+        "averageSessionDuration": "float64",
+        "bounceRate": "float64",
+        "engagedSessions": "Int64",
+        "totalRevenue": "float64",
+        "conversions": "float64",
+        "FULL_ADDRESS": "string",
+        "IN_GA": "bool",
+    }
+    SOURCE = "google_api"
+    _URL_COLUMN = "FULL_ADDRESS"
+    _BEGIN: int
+    _END: int
 
     def __init__(self, project: ProjectModel, **kwargs: Any) -> None:
         super().__init__(project, **kwargs)
@@ -56,6 +73,21 @@ class BaseGoogleAnalyticsExport(BaseExport):
         """Flag to indicate if the export requires manual intervention."""
         pass
 
+    def _fingerprint_inputs(self) -> Dict[str, Any]:
+        # The window definition, not its concrete dates, so the daily shift is left to the max age
+        inputs = super()._fingerprint_inputs()
+        inputs.update(
+            {
+                "property_id": self.project.ga4_property_id,
+                "dimensions": self._DIMENSIONS,
+                "metrics": self._METRICS,
+                "time_unit": self.time_unit,
+                "begin": self._BEGIN,
+                "end": self._END,
+            }
+        )
+        return inputs
+
     def _cleanup(self) -> None:
         pass
 
@@ -82,5 +114,5 @@ class BaseGoogleAnalyticsExport(BaseExport):
         )
 
     def _finalize(self) -> None:
-        self._temp_data["FULL_ADDRESS"] = self._temp_data["pagePath"].apply(lambda page_path: UrlModelManager.get_full_address(self.project.website.root_url.full_address, page_path))
+        self._temp_data["FULL_ADDRESS"] = UrlOperator.get_full_address(self.project.website.root_url.full_address, self._temp_data["pagePath"])
         self._temp_data["IN_GA"] = True
@@ -1,19 +1,43 @@
+import itertools
 import logging
+import os
+import re
+import shutil
+import threading
 from abc import abstractmethod
-from datetime import datetime, timedelta
-from typing import Any
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
 
+import pandas as pd
 from dateutil.relativedelta import relativedelta
+from django.conf import settings
 
 from domain.export.base_export import BaseExport
 from model.core.project.models import ProjectModel
-from model.core.url.models import UrlModelManager
 from operators.google_search_console_operator import GoogleSearchConsoleOperator
+from operators.url_operator import UrlOperator
 
 logger = logging.getLogger(__name__)
 
 
 class BaseGoogleSearchConsoleExport(BaseExport):
+    _SCHEMA: Dict[str, str] = {
+        "query": "string",
+        "page": "string",
+        "clicks": "int64",
+        "impressions": "int64",
+        "ctr": "float64",
+        "position": "float64",
+        "IN_GSC": "bool",
+    }
+    SOURCE = "google_api"
+    _BEGIN: int
+    _END: int
+    _PARTITION_BATCH_DAYS = 31  # day partitions folded into the running aggregate at once
+    # Exports sharing a partition directory fetch its missing days one at a time
+    _partition_locks: Dict[str, threading.Lock] = {}
+    _partition_locks_guard = threading.Lock()
+
     def __init__(self, project: ProjectModel, **kwargs: Any) -> None:
         super().__init__(project, **kwargs)
         self._googlesearchconsole_operator = GoogleSearchConsoleOperator()
@@ -47,6 +71,20 @@ class BaseGoogleSearchConsoleExport(BaseExport):
         """Flag to indicate if the export requires manual intervention."""
         pass
 
+    def _fingerprint_inputs(self) -> Dict[str, Any]:
+        # The window definition, not its concrete dates, so the daily shift is left to the max age
+        inputs = super()._fingerprint_inputs()
+        inputs.update(
+            {
+                "site_url": self.project.gsc_property_name,
+                "dimensions": self.dimensions,
+                "time_unit": self.time_unit,
+                "begin": self._BEGIN,
+                "end": self._END,
+            }
+        )
+        return inputs
+
     def _cleanup(self) -> None:
         pass
 
@@ -62,15 +100,117 @@ class BaseGoogleSearchConsoleExport(BaseExport):
     def _prepare(self) -> None:
         pass
 
+    @property
+    def partition_dir(self) -> str:
+        """Directory of the per-day partitions, shared by every export of the same property and dimensions."""
+        property_slug = re.sub(r"[^A-Za-z0-9]+", "_", self.project.gsc_property_name or "").strip("_")
+        return os.path.join(self.project.data_folder, "partitions", "googlesearchconsole", property_slug, "_".join(self.dimensions))
+
+    def _get_partition_path(self, day: date) -> str:
+        return os.path.join(self.partition_dir, f"{day.isoformat()}.{self.store.extension}")
+
+    def _get_days(self) -> List[date]:
+        first_day, last_day = self.start_date.date(), self.end_date.date()
+        return [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+
+    def _is_partition_current(self, day: date) -> bool:
+        """A partition is current once it was fetched late enough after its day for GSC to have finalized the data."""
+        partition_path = self._get_partition_path(day)
+        if not os.path.exists(partition_path):
+            return False
+        fetched_on = datetime.fromtimestamp(os.path.getmtime(partition_path)).date()
+        return (fetched_on - day).days > settings.GSC_REFETCH_DAYS
+
+    @staticmethod
+    def _group_consecutive_days(days: List[date]) -> List[List[date]]:
+        ranges: List[List[date]] = []
+        for day in sorted(days):
+            if ranges and (day - ranges[-1][-1]).days == 1:
+                ranges[-1].append(day)
+            else:
+                ranges.append([day])
+        return ranges
+
+    def _fetch_partitions(self, days: List[date]) -> None:
+        """Fetch the given consecutive days with a date dimension and store one partition per day.
+
+        Decoded chunks are spilled to the temp directory split by day as they arrive, then each day is consolidated on its own,
+        so memory stays bounded by the chunk size and the size of a single day.
+        """
+        spill_dir = os.path.join(self.temp_dir, "chunks")
+        # Chunks left behind by an interrupted run would be counted twice
+        shutil.rmtree(spill_dir, ignore_errors=True)
+        os.makedirs(spill_dir)
+        chunk_numbers = itertools.count()
+        chunk_numbers_lock = threading.Lock()
+
+        def spill_chunk(chunk: pd.DataFrame) -> None:
+            with chunk_numbers_lock:
+                chunk_number = next(chunk_numbers)
+            for day, day_chunk in chunk.groupby("date", sort=False):
+                self.store.save(day_chunk.drop(columns=["date"]), os.path.join(spill_dir, f"{day}.{chunk_number}.{self.store.extension}"))
+
+        try:
+            total_rows, failed_shards = self._googlesearchconsole_operator.stream_data_sharded(
+                site_url=self.project.gsc_property_name,
+                start_date=days[0],
+                end_date=days[-1],
+                dimensions=["date"] + self.dimensions,
+                on_chunk=spill_chunk,
+                shard_unit=settings.GSC_SHARD_UNIT,
+                round_metrics=False,
+            )
+            # Days of failed shards hold partial data; leaving them missing gets them fetched again
+            failed_days = {day for day in days for shard_start, shard_end, _ in failed_shards if shard_start <= day <= shard_end}
+            if failed_days:
+                logger.warning(f"GSC fetch failed for {len(failed_days)} days from {days[0]} to {days[-1]}; their partitions are not written.")
+            elif not total_rows:
+                # A successful fetch without rows is still stored, so the days are not queried again on every run
+                logger.info(f"No GSC data returned from {days[0]} to {days[-1]}; writing empty partitions.")
+
+            spilled_files = os.listdir(spill_dir)
+            for day in days:
+                if day in failed_days:
+                    continue
+                day_files = [filename for filename in spilled_files if filename.startswith(f"{day.isoformat()}.")]
+                if day_files:
+                    day_data = pd.concat([self.store.load(os.path.join(spill_dir, filename)) for filename in day_files], ignore_index=True)
+                else:
+                    day_data = pd.DataFrame(columns=self.dimensions + ["clicks", "impressions", "ctr", "position"])
+                self.store.save(day_data, self._get_partition_path(day), self.schema)
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+    def _assemble_partitions(self, days: List[date]) -> pd.DataFrame:
+        """Aggregate the day partitions of the window, a batch of days at a time to bound memory."""
+        aggregated: Optional[pd.DataFrame] = None
+        partition_paths = [self._get_partition_path(day) for day in days if os.path.exists(self._get_partition_path(day))]
+        for batch_start in range(0, len(partition_paths), self._PARTITION_BATCH_DAYS):
+            batch = [self.store.load(path, self.schema) for path in partition_paths[batch_start : batch_start + self._PARTITION_BATCH_DAYS]]
+            if aggregated is not None:
+                batch.append(aggregated)
+            aggregated = self._googlesearchconsole_operator.aggregate_data(pd.concat(batch, ignore_index=True), self.dimensions, round_metrics=False)
+        if aggregated is None:
+            return pd.DataFrame()
+        aggregated["ctr"] = aggregated["ctr"].round(2)
+        aggregated["position"] = aggregated["position"].round(1)
+        return aggregated
+
+    def _get_partition_lock(self) -> threading.Lock:
+        with self._partition_locks_guard:
+            return self._partition_locks.setdefault(self.partition_dir, threading.Lock())
+
     def _execute(self) -> None:
         self._googlesearchconsole_operator.set_credentials(self.project.gsc_auth_email)
-        self._temp_data = self._googlesearchconsole_operator.fetch_data(
-            site_url=self.project.gsc_property_name,
-            start_date=self.start_date,
-            end_date=self.end_date,
-            dimensions=self.dimensions,
-        )
+        os.makedirs(self.partition_dir, exist_ok=True)
+        days = self._get_days()
+        with self._get_partition_lock():
+            missing_days = [day for day in days if not self._is_partition_current(day)]
+            logger.info(f"{len(days) - len(missing_days)} of {len(days)} GSC day partitions are current; fetching {len(missing_days)} days.")
+            for consecutive_days in self._group_consecutive_days(missing_days):
+                self._fetch_partitions(consecutive_days)
+        self._temp_data = self._assemble_partitions(days)
 
     def _finalize(self) -> None:
-        self._temp_data = self._temp_data[~self._temp_data["page"].apply(UrlModelManager.is_fragmented)]
+        self._temp_data = self._temp_data[~UrlOperator.is_fragmented(self._temp_data["page"])]
         self._temp_data["IN_GSC"] = True
@@ -9,6 +9,7 @@ class GoogleSearchConsolePageMonths16To0Export(BaseGoogleSearchConsoleExport):
     _BEGIN = 16  # period begins _BEGIN _MEASUREMENT_UNIT ago
     _END = 0  # period ends _END _MEASUREMENT_UNIT ago
     _DIMENSIONS: List[str] = ["page"]
+    _URL_COLUMN = "page"  # feeds the url inventory; the query-page exports do not need url ids
 
     @property
     def export_name(self) -> str:
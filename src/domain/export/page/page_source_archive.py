@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+
+class PageSourceArchive:
+    """Content-addressed store for page sources.
+
+    Each distinct page source is compressed once and appended to a pack file. The index (one JSON line per blob) records
+    where it lives, so a reference of the form ``sha256:<hex>`` can be read back with a single seek.
+    """
+
+    _INDEX_FILENAME = "index.jsonl"
+    _PACK_FILENAME = "pack-{:05d}.bin"
+    _MAX_PACK_BYTES = 256 * 1024 * 1024
+    _REFERENCE_PREFIX = "sha256:"
+    _CODEC = "zstd" if pa.Codec.is_available("zstd") else "gzip"
+
+    def __init__(self, archive_dir: str):
+        self.archive_dir = archive_dir
+        self.index_path = os.path.join(archive_dir, self._INDEX_FILENAME)
+        os.makedirs(archive_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, int]] = self._load_index()
+        self._pack_number = max((entry["pack"] for entry in self._index.values()), default=0)
+        self._pack_file = None
+        self._index_file = None
+
+    def _load_index(self) -> Dict[str, Dict[str, int]]:
+        index = {}
+        if not os.path.exists(self.index_path):
+            return index
+        with open(self.index_path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write leaves a truncated last line; its blob is simply written again
+                    continue
+                index[entry.pop("hash")] = entry
+        return index
+
+    def _get_pack_path(self, pack_number: int) -> str:
+        return os.path.join(self.archive_dir, self._PACK_FILENAME.format(pack_number))
+
+    def _open_pack(self):
+        """Return the pack file being appended to, starting a new pack once the current one is full."""
+        if self._pack_file is not None and self._pack_file.tell() >= self._MAX_PACK_BYTES:
+            self._pack_file.close()
+            self._pack_file = None
+            self._pack_number += 1
+        if self._pack_file is None:
+            self._pack_file = open(self._get_pack_path(self._pack_number), "ab")
+            if self._pack_file.tell() >= self._MAX_PACK_BYTES:
+                return self._open_pack()
+        return self._pack_file
+
+    def __contains__(self, reference: str) -> bool:
+        return reference[len(self._REFERENCE_PREFIX) :] in self._index
+
+    def put(self, content: str) -> str:
+        """Store a page source unless an identical one is already archived, and return its reference."""
+        raw = content.encode("utf-8")
+        content_hash = hashlib.sha256(raw).hexdigest()
+        with self._lock:
+            if content_hash not in self._index:
+                blob = pa.Codec(self._CODEC).compress(raw, asbytes=True)
+                pack_file = self._open_pack()
+                entry = {"pack": self._pack_number, "offset": pack_file.tell(), "length": len(blob), "size": len(raw), "codec": self._CODEC}
+                pack_file.write(blob)
+                pack_file.flush()
+
+                # The blob is on disk before the index points at it
+                if self._index_file is None:
+                    self._index_file = open(self.index_path, "a", encoding="utf-8")
+                self._index_file.write(json.dumps({"hash": content_hash, **entry}) + "\n")
+                self._index_file.flush()
+                self._index[content_hash] = entry
+        return self._REFERENCE_PREFIX + content_hash
+
+    def get(self, reference: str) -> Optional[str]:
+        """Read an archived page source back, or None when the reference is unknown."""
+        entry = self._index.get(reference[len(self._REFERENCE_PREFIX) :])
+        if entry is None:
+            logger.warning(f"Page source {reference} is not in the archive {self.archive_dir}")
+            return None
+        with open(self._get_pack_path(entry["pack"]), "rb") as pack_file:
+            pack_file.seek(entry["offset"])
+            blob = pack_file.read(entry["length"])
+        return pa.Codec(entry["codec"]).decompress(blob, decompressed_size=entry["size"], asbytes=True).decode("utf-8")
+
+    def close(self) -> None:
+        with self._lock:
+            for file in (self._pack_file, self._index_file):
+                if file is not None:
+                    file.close()
+            self._pack_file = None
+            self._index_file = None
@@ -1,27 +1,53 @@
-import hashlib
+import json
 import logging
 import os
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import cached_property
+from typing import Any, Dict, Iterable, List, Optional, TextIO
 
 import pandas as pd
+from django.conf import settings
 
 from domain.export.base_export import BaseExport
+from domain.export.page.page_source_archive import PageSourceArchive
 from model.core.project.models import ProjectModel
 from operators.browser_operator import BrowserOperator
+from operators.browser_pool_operator import BrowserPoolOperator
+from operators.http_operator import HttpOperator
 
 logger = logging.getLogger(__name__)
 
 
 class RawPageDataExport(BaseExport):
     _EXPORT_NAME = "page_data"
+    _URL_COLUMN = "request_url"
+    SOURCE = "browser"
     _IS_MANUAL = False
+    _MAX_AGE_DAYS = settings.MAX_CRAWL_EXPORT_AGE_DAYS  # the url list is part of the fingerprint
+    _SCHEMA: Dict[str, str] = {
+        "request_url": "string",
+        "response_url": "string",
+        "page_content_file": "string",
+        "etag": "string",
+        "last_modified": "string",
+        "raw_content_hash": "string",
+    }
+    _COLUMNS = ["request_url", "status_code", "response_url", "page_content_file", "etag", "last_modified", "raw_content_hash"]
+    _VALIDATORS = ["etag", "last_modified", "raw_content_hash"]
 
     def __init__(self, project: ProjectModel, **kwargs: Any):
         super().__init__(project, **kwargs)
-        self._browser_operator = None
 
-        self.source_dir = os.path.join(project.data_folder, "source")
-        os.makedirs(self.source_dir, exist_ok=True)
+        # Every fetched page is recorded here as soon as its source is on disk, so an interrupted run can resume
+        self.journal_path = os.path.join(self.temp_dir, "journal.jsonl")
+        self._is_complete = False
+        self._previous_pages: Dict[str, Dict[str, Any]] = {}
+
+    @cached_property
+    def archive(self) -> PageSourceArchive:
+        """Archive of the page sources that page_content_file references; built on first use, as loading it reads its whole index."""
+        return PageSourceArchive(os.path.join(self.project.data_folder, "source"))
 
     @property
     def export_name(self) -> str:
@@ -31,81 +57,145 @@ class RawPageDataExport(BaseExport):
     def is_manual(self) -> bool:
         return self._IS_MANUAL
 
-    def _save_page_sources(self) -> None:
-        """Save the page sources to HTML files."""
-        for index, row in self._page_sources.iterrows():
-            file_path = os.path.join(self.source_dir, row["filename"])
-
-            with open(file_path, "w", encoding="utf-8") as file:
-                file.write(row["page_content"])
+    def _read_journal(self) -> Dict[str, Dict[str, Any]]:
+        """Load the pages recorded by previous attempts that are still within max_age_days, by request url."""
+        entries: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.journal_path):
+            return entries
+
+        cutoff = datetime.now() - timedelta(days=self.max_age_days)
+        with open(self.journal_path, "r", encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write leaves a truncated last line
+                    continue
+                if datetime.fromisoformat(entry.pop("fetched_at")) < cutoff:
+                    continue
+                entries[entry["request_url"]] = entry
+        return entries
+
+    @staticmethod
+    def _record_page(journal: TextIO, row: Dict[str, Any]) -> None:
+        journal.write(json.dumps({**row, "fetched_at": datetime.now().isoformat()}) + "\n")
+        journal.flush()
+
+    def _write_page(self, journal: TextIO, row: Dict[str, Any]) -> None:
+        """Archive the page source, then record the page in the journal."""
+        row["page_content_file"] = self.archive.put(row.pop("page_content"))
+        self._record_page(journal, row)
 
     def _cleanup(self) -> None:
-        pass
+        # Keep the journal of an unfinished run so the next run can resume from it
+        if self._is_complete and os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
 
     def _prepare(self) -> None:
-        self._browser_operator = BrowserOperator()
+        self._previous_pages = self._load_previous_pages()
+
+    def _load_previous_pages(self) -> Dict[str, Dict[str, Any]]:
+        """Pages of the stored export whose source is archived and that carry validators, by request url."""
+        if not os.path.exists(self.save_path):
+            return {}
+        try:
+            previous_data = self.store.load(self.save_path, self.schema)
+        except Exception as e:
+            logger.warning(f"Failed to load the previous page data from {self.save_path}: {e}")
+            return {}
+        if not set(self._COLUMNS).issubset(previous_data.columns):
+            return {}
+
+        previous_data = previous_data[previous_data["page_content_file"].fillna("").map(lambda reference: reference in self.archive)]
+        previous_data = previous_data.dropna(subset=self._VALIDATORS, how="all")
+        previous_data = previous_data.astype(object).where(previous_data.notna(), None)
+        return {row["request_url"]: row for row in previous_data[self._COLUMNS].to_dict("records")}
+
+    @staticmethod
+    def _is_unchanged(previous_page: Dict[str, Any], check: Optional[Dict[str, Any]]) -> bool:
+        """A page is unchanged when the server still answers at the same url and either reports 304 or serves the same bytes."""
+        if check is None or check["url"] != previous_page["response_url"]:
+            return False
+        if check["not_modified"]:
+            return True
+        return check["raw_content_hash"] is not None and check["raw_content_hash"] == previous_page["raw_content_hash"]
+
+    def _reuse_unchanged_pages(self, journal: TextIO, urls: List[str]) -> List[str]:
+        """Record pages that did not change since the previous export and return the urls that still need a render."""
+        candidates = [url for url in urls if url in self._previous_pages]
+        if not candidates:
+            return urls
+
+        http_operator = HttpOperator()
+
+        def check(url: str) -> Optional[Dict[str, Any]]:
+            previous_page = self._previous_pages[url]
+            return http_operator.check(url, previous_page["etag"], previous_page["last_modified"])
+
+        unchanged_urls = set()
+        with ThreadPoolExecutor(max_workers=settings.HTTP_MAX_WORKERS) as executor:
+            for url, result in zip(candidates, executor.map(check, candidates)):
+                previous_page = self._previous_pages[url]
+                if not self._is_unchanged(previous_page, result):
+                    continue
+                row = dict(previous_page)
+                if result["not_modified"]:
+                    row.update({"etag": result["etag"], "last_modified": result["last_modified"]})
+                else:
+                    row.update({validator: result[validator] for validator in self._VALIDATORS})
+                self._record_page(journal, row)
+                unchanged_urls.add(url)
+
+        logger.info(f"{len(unchanged_urls)} of {len(candidates)} previously fetched pages are unchanged and reuse their stored source.")
+        return [url for url in urls if url not in unchanged_urls]
+
+    @staticmethod
+    def _fetch_page(browser_operator: BrowserOperator, url: str) -> Dict[str, Any]:
+        """Load one url in a pool browser and capture its status, final url and source."""
+        page_content = browser_operator.get_page_contents(url)
+        response_url = browser_operator.driver.current_url
+        status_code = browser_operator.get_status_code(url)
+
+        # Validators of the final document let the next run skip the render when the page did not change
+        document_response = browser_operator.get_response(response_url)
+        if document_response is not None:
+            validators = HttpOperator.get_validators(document_response.headers, browser_operator.get_response_body(document_response))
+        else:
+            validators = {"etag": None, "last_modified": None, "raw_content_hash": None}
+
+        return {
+            "request_url": url,
+            "status_code": status_code,
+            "response_url": response_url,
+            "page_content": page_content,
+            **validators,
+        }
 
     def _execute(self) -> None:
-        urls = self.kwargs.get("urls", [])
-        for url in urls:
-            try:
-                self._browser_operator.get_page_contents(url)
-                response_url = self._browser_operator.driver.current_url
-
-                # Initialize a dictionary to categorize status codes for the specific request URL
-                status_codes = {"5xx": [], "4xx": [], "3xx": [], "2xx": []}
-
-                # Inspect all requests and responses
-                for request in self._browser_operator.driver.requests:
-                    if request.response and request.url == url:  # Filter by request URL
-                        code = request.response.status_code
-                        category = f"{code // 100}xx"  # Group status codes by their first digit
-                        status_codes[category].append(code)
-
-                # Determine the most critical status code for the specific request URL
-                relevant_status_code = None
-                for category in ["5xx", "4xx", "3xx", "2xx"]:
-                    if status_codes[category]:
-                        relevant_status_code = max(status_codes[category])  # Choose the "worst" code within the category
-                        break
-
-                # Handle cases where the request URL matches the response URL but no status code was found
-                if url == response_url and relevant_status_code is None:
-                    relevant_status_code = "Unknown"
-
-                # Append data to the DataFrame
-                new_row = pd.DataFrame(
-                    {
-                        "request_url": [url],
-                        "status_code": [relevant_status_code],
-                        "response_url": [response_url],
-                        "page_content": [self._browser_operator.driver.page_source],
-                    }
-                )
-                self._temp_data = pd.concat([self._temp_data, new_row], ignore_index=True)
-            except Exception as e:
-                logger.error(f"Failed to fetch content for URL {url}: {e}")
+        urls = list(dict.fromkeys(self.kwargs.get("urls", [])))
+        journal_entries = self._read_journal()
+        pending_urls = [url for url in urls if url not in journal_entries]
+        if journal_entries:
+            logger.info(f"Resuming page fetch: {len(urls) - len(pending_urls)} of {len(urls)} urls already fetched.")
+
+        try:
+            with open(self.journal_path, "a", encoding="utf-8") as journal:
+                pending_urls = self._reuse_unchanged_pages(journal, pending_urls)
+                for url, row, error in BrowserPoolOperator().run(pending_urls, self._fetch_page):
+                    if error is not None:
+                        logger.error(f"Failed to fetch content for URL {url}: {error}")
+                        continue
+                    self._write_page(journal, row)
+        finally:
+            self.archive.close()
+
+        self._temp_data = self._build_data(urls)
+
+    def _build_data(self, urls: Iterable[str]) -> pd.DataFrame:
+        """Build the export rows from the journal, in url order."""
+        journal_entries = self._read_journal()
+        rows = [journal_entries[url] for url in urls if url in journal_entries]
+        return pd.DataFrame(rows, columns=self._COLUMNS)
 
     def _finalize(self) -> None:
-        self._browser_operator.close_browser()
-
-        filenames = []
-        page_sources = []
-
-        for index, row in self._temp_data.iterrows():
-            url_hash = hashlib.md5(row["request_url"].encode("utf-8")).hexdigest()
-            filename = f"{url_hash}.html"
-            filenames.append(filename)
-
-            # Prepare a separate list for page sources to be saved later
-            page_sources.append({"filename": filename, "page_content": row["page_content"]})
-
-        # Add the filename column to the main DataFrame
-        self._temp_data["page_content_file"] = filenames
-
-        # Drop the page_content column from the main DataFrame
-        self._temp_data.drop(columns=["page_content"], inplace=True)
-
-        # Create a new DataFrame for page sources
-        self._page_sources = pd.DataFrame(page_sources)
-        self._save_page_sources()
+        self._is_complete = True
@@ -1,15 +1,44 @@
 import logging
 from abc import abstractmethod
-from typing import Any
+from typing import Any, Dict, List
 
 from domain.export.base_export import BaseExport
-from operators.screamingfrog_operator import ScreamingfrogOperator
+from operators.screamingfrog_operator import ScreamingfrogCrawlError, ScreamingfrogOperator
 
 logger = logging.getLogger(__name__)
 
 
 class BaseScreamingfrogExport(BaseExport):
+    SOURCE = "docker"
+    _URL_COLUMN = "Address"
     _IS_MANUAL = False
+    _SCHEMA: Dict[str, str] = {
+        "Address": "string",
+        "Status Code": "Int64",
+        "IN_CRAWL": "bool",
+        "IN_SITEMAP": "bool",
+    }
+    # internal_html exports have 70+ columns; only these are kept
+    _CSV_COLUMNS: List[str] = [
+        "Address",
+        "Content Type",
+        "Status Code",
+        "Status",
+        "Indexability",
+        "Indexability Status",
+        "Title 1",
+        "Meta Description 1",
+        "H1-1",
+        "Meta Robots 1",
+        "Canonical Link Element 1",
+        "Word Count",
+        "Crawl Depth",
+        "Inlinks",
+        "Response Time",
+    ]
+    _CSV_CATEGORIES: List[str] = ["Content Type", "Status", "Indexability", "Indexability Status", "Meta Robots 1"]
+    _CRAWL_CONFIG: str
+    _EXPORT_TABS: List[str]
 
     def __init__(self, project, **kwargs: Any):
         super().__init__(project, **kwargs)
@@ -19,6 +48,11 @@ class BaseScreamingfrogExport(BaseExport):
     def is_manual(self) -> bool:
         return self._IS_MANUAL
 
+    def _fingerprint_inputs(self) -> Dict[str, Any]:
+        inputs = super()._fingerprint_inputs()
+        inputs.update({"crawl_config": self._CRAWL_CONFIG, "export_tabs": self._EXPORT_TABS, "csv_columns": self._CSV_COLUMNS})
+        return inputs
+
     @abstractmethod
     def _set_crawl_config(self) -> None:
         pass
@@ -31,6 +65,8 @@ class BaseScreamingfrogExport(BaseExport):
         self._set_crawl_config()
         self._set_export_tabs()
         self._screamingfrog_operator.run()
+        if not self._screamingfrog_operator.succeeded:
+            raise ScreamingfrogCrawlError(f"The {self.export_name} crawl did not complete (exit code {self._screamingfrog_operator.exit_code}).")
 
     def _cleanup(self) -> None:
         self._empty_temp_dir()
@@ -1,9 +1,15 @@
+import heapq
 import logging
 import os
 import posixpath
-from typing import Any, List
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+import pandas as pd
+from django.conf import settings
 
 from domain.export.screamingfrog.base_screamingfrog_export import BaseScreamingfrogExport
+from operators.screamingfrog_operator import ScreamingfrogCrawlError, ScreamingfrogOperator
 
 logger = logging.getLogger(__name__)
 
@@ -12,29 +18,90 @@ class ScreamingFrogListCrawlExport(BaseScreamingfrogExport):
     _EXPORT_NAME: str = "screamingfrog_list_crawl_export"
     _CRAWL_CONFIG: str = "/seospiderconfig/listcrawl.seospiderconfig"
     _EXPORT_TABS: List[str] = ["Internal:HTML"]
+    _MAX_AGE_DAYS = settings.MAX_CRAWL_EXPORT_AGE_DAYS  # the url list is part of the fingerprint
 
     def __init__(self, project, **kwargs: Any):
         super().__init__(project, **kwargs)
+        self._shard_operators: List[ScreamingfrogOperator] = []
 
     @property
     def export_name(self) -> str:
         return self._EXPORT_NAME
 
+    @staticmethod
+    def _shard_urls(urls: List[str], shard_count: int, split_hosts: bool = False) -> List[List[str]]:
+        """
+        Split the url list into at most shard_count balanced shards.
+
+        Hosts stay whole so each host is crawled by one container at the crawl config's rate. The largest hosts are
+        placed first, each on the currently smallest shard. With split_hosts the urls are cut into equal slices instead.
+        """
+        if not urls:
+            return []
+        shard_count = max(1, min(shard_count, len(urls)))
+        if split_hosts:
+            # Slices of the host-sorted list keep the urls of a host together where possible
+            urls = sorted(urls, key=lambda url: urlparse(url).netloc)
+            slice_size = -(-len(urls) // shard_count)
+            return [urls[start : start + slice_size] for start in range(0, len(urls), slice_size)]
+
+        urls_by_host: Dict[str, List[str]] = {}
+        for url in urls:
+            urls_by_host.setdefault(urlparse(url).netloc, []).append(url)
+
+        shards: List[List[str]] = [[] for _ in range(min(shard_count, len(urls_by_host)))]
+        shard_sizes = [(0, index) for index in range(len(shards))]
+        for host_urls in sorted(urls_by_host.values(), key=len, reverse=True):
+            size, index = heapq.heappop(shard_sizes)
+            shards[index].extend(host_urls)
+            heapq.heappush(shard_sizes, (size + len(host_urls), index))
+        return shards
+
     def _set_crawl_config(self) -> None:
-        self._screamingfrog_operator.set_crawl_config(self._CRAWL_CONFIG)
+        for operator in self._shard_operators:
+            operator.set_crawl_config(self._CRAWL_CONFIG)
 
     def _set_export_tabs(self) -> None:
-        self._screamingfrog_operator.set_export_tabs(self._EXPORT_TABS)
+        for operator in self._shard_operators:
+            operator.set_export_tabs(self._EXPORT_TABS)
 
     def _prepare(self) -> None:
         url_list_filename = "crawl_list.txt"
         urls = self.kwargs.get("urls", [])
-        local_crawl_list_file_path = os.path.join(self.temp_dir, url_list_filename)
-        with open(local_crawl_list_file_path, "w") as file:
-            for url in urls:
-                file.write(f"{url}\n")
-        docker_crawl_list_file_path = posixpath.join("/export", url_list_filename)
-        self._screamingfrog_operator.set_crawl_list(docker_crawl_list_file_path)
+        shards = self._shard_urls(urls, settings.SCREAMINGFROG_LIST_CRAWL_SHARDS, settings.SCREAMINGFROG_LIST_CRAWL_SPLIT_HOSTS)
+        self._shard_operators = []
+        for index, shard_urls in enumerate(shards):
+            # Every shard crawls in its own container with its own export mount
+            shard_dir = os.path.join(self.temp_dir, f"shard_{index}")
+            os.makedirs(shard_dir, exist_ok=True)
+            local_crawl_list_file_path = os.path.join(shard_dir, url_list_filename)
+            with open(local_crawl_list_file_path, "w") as file:
+                for url in shard_urls:
+                    file.write(f"{url}\n")
+            operator = ScreamingfrogOperator(shard_dir)
+            docker_crawl_list_file_path = posixpath.join("/export", url_list_filename)
+            operator.set_crawl_list(docker_crawl_list_file_path)
+            self._shard_operators.append(operator)
+        logger.info(f"Crawling {len(urls)} urls in {len(shards)} shards")
+
+    def _execute(self) -> None:
+        self._set_crawl_config()
+        self._set_export_tabs()
+        ScreamingfrogOperator.run_concurrently(self._shard_operators)
+
+        # The shards only make up the list crawl together; a partial crawl must not be stored as complete
+        failed_shards = [operator.temp_dir for operator in self._shard_operators if not operator.succeeded]
+        if failed_shards:
+            raise ScreamingfrogCrawlError(f"{len(failed_shards)} of {len(self._shard_operators)} list crawl shards failed: {', '.join(failed_shards)}")
+
+        shard_data = []
+        for operator in self._shard_operators:
+            try:
+                shard_data.append(self._merge_csv(operator.temp_dir))
+            except FileNotFoundError:
+                raise ScreamingfrogCrawlError(f"List crawl shard {operator.temp_dir} produced no export.")
+        if shard_data:
+            self._temp_data = pd.concat(shard_data, ignore_index=True)
 
     def _finalize(self) -> None:
         pass
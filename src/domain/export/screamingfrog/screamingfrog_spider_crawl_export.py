@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import Any, Dict, List
 
 from domain.export.screamingfrog.base_screamingfrog_export import BaseScreamingfrogExport
 
@@ -18,6 +18,11 @@ class ScreamingFrogSpiderCrawlExport(BaseScreamingfrogExport):
     def export_name(self) -> str:
         return self._EXPORT_NAME
 
+    def _fingerprint_inputs(self) -> Dict[str, Any]:
+        inputs = super()._fingerprint_inputs()
+        inputs["root_url"] = self.project.website.root_url.full_address
+        return inputs
+
     def _set_crawl_config(self) -> None:
         self._screamingfrog_operator.set_crawl_config(self._CRAWL_CONFIG)
 
@@ -1,6 +1,6 @@
 import logging
 from abc import abstractmethod
-from typing import Any
+from typing import Any, Dict
 
 from domain.export.base_export import BaseExport
 from model.core.project.models import ProjectModel
@@ -9,6 +9,7 @@ logger = logging.getLogger(__name__)
 
 
 class BaseSemrushExport(BaseExport):
+    SOURCE = "manual"
     _IS_MANUAL = True
 
     def __init__(self, project: ProjectModel, **kwargs: Any):
@@ -30,6 +31,11 @@ class BaseSemrushExport(BaseExport):
         """Flag to indicate if the export requires manual intervention."""
         pass
 
+    def _fingerprint_inputs(self) -> Dict[str, Any]:
+        inputs = super()._fingerprint_inputs()
+        inputs["root_url"] = self.project.website.root_url.full_address
+        return inputs
+
     def _cleanup(self) -> None:
         self._empty_temp_dir()
 
@@ -7,6 +7,7 @@ logger = logging.getLogger(__name__)
 
 class SemrushAnalyticsBacklinksBacklinksDomainExport(BaseSemrushExport):
     _EXPORT_NAME = "semrush_analytics_backlinks_backlinks_domain"
+    _URL_COLUMN = "Target url"
     _URL_TEMPLATE = "https://www.semrush.com/analytics/backlinks/backlinks/?searchType=domain&q={}"
 
     @property
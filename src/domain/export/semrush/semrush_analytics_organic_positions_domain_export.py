@@ -7,6 +7,7 @@ logger = logging.getLogger(__name__)
 
 class SemrushAnalyticsOrganicPositionsDomainExport(BaseSemrushExport):
     _EXPORT_NAME = "semrush_analytics_organic_positions_domain"
+    _URL_COLUMN = "URL"
     _URL_TEMPLATE = "https://www.semrush.com/analytics/organic/positions/?sortField=&sortDirection=desc&db=us&searchType=domain&q={}"
 
     @property
@@ -0,0 +1,27 @@
+from typing import Dict
+
+import pandas as pd
+import pyarrow as pa
+
+from domain.export.store.base_export_store import BaseExportStore
+
+
+class ArrowExportStore(BaseExportStore):
+    """Arrow IPC files, loaded through a memory map so numeric columns are not copied on read."""
+
+    _EXTENSION = "arrow"
+
+    @property
+    def extension(self) -> str:
+        return self._EXTENSION
+
+    def _write(self, data: pd.DataFrame, path: str) -> None:
+        table = pa.Table.from_pandas(self._normalize_object_columns(data.copy(deep=False)), preserve_index=False)
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    def _read(self, path: str, schema: Dict[str, str]) -> pd.DataFrame:
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        return table.to_pandas(split_blocks=True)
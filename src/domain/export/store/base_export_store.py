@@ -0,0 +1,67 @@
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class BaseExportStore(ABC):
+    """Persist and load export DataFrames in a specific on-disk format."""
+
+    @property
+    @abstractmethod
+    def extension(self) -> str:
+        """File extension used by the store, without the leading dot."""
+        pass
+
+    @abstractmethod
+    def _write(self, data: pd.DataFrame, path: str) -> None:
+        """Write the already typed DataFrame to path."""
+        pass
+
+    @abstractmethod
+    def _read(self, path: str, schema: Dict[str, str]) -> pd.DataFrame:
+        """Read the DataFrame stored at path."""
+        pass
+
+    @staticmethod
+    def apply_schema(data: pd.DataFrame, schema: Optional[Dict[str, str]]) -> pd.DataFrame:
+        """Cast the columns declared in schema to their dtype, ignoring columns the frame does not have.
+
+        A column that cannot be cast keeps its dtype; the other columns are still cast.
+        """
+        if not schema:
+            return data
+        data = data.copy(deep=False)
+        for column, dtype in schema.items():
+            if column not in data.columns:
+                continue
+            try:
+                data[column] = data[column].astype(dtype)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Failed to cast column '{column}' to {dtype}: {e}")
+        return data
+
+    @staticmethod
+    def _normalize_object_columns(data: pd.DataFrame) -> pd.DataFrame:
+        """Convert object columns holding mixed value types to strings so they can be stored in a typed format."""
+        for column in data.columns:
+            if data[column].dtype == object and pd.api.types.infer_dtype(data[column], skipna=True) not in ("string", "empty"):
+                data[column] = data[column].where(data[column].isna(), data[column].astype(str))
+        return data
+
+    def save(self, data: pd.DataFrame, path: str, schema: Optional[Dict[str, str]] = None) -> None:
+        """Write data to path atomically, casting it to the declared schema first."""
+        data = self.apply_schema(data, schema)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._write(data, temp_path)
+        os.replace(temp_path, path)
+        logger.info(f"[export stored] {path}")
+
+    def load(self, path: str, schema: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """Load the DataFrame stored at path."""
+        return self._read(path, schema or {})
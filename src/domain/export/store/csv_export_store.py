@@ -0,0 +1,22 @@
+from typing import Dict
+
+import pandas as pd
+
+from domain.export.store.base_export_store import BaseExportStore
+
+
+class CsvExportStore(BaseExportStore):
+    """Plain CSV files, kept as an opt-in interchange format."""
+
+    _EXTENSION = "csv"
+
+    @property
+    def extension(self) -> str:
+        return self._EXTENSION
+
+    def _write(self, data: pd.DataFrame, path: str) -> None:
+        data.to_csv(path, index=False)
+
+    def _read(self, path: str, schema: Dict[str, str]) -> pd.DataFrame:
+        # CSV carries no types, so the declared schema is applied after parsing
+        return self.apply_schema(pd.read_csv(path), schema)
@@ -0,0 +1,26 @@
+import logging
+from typing import Dict, Type
+
+from domain.export.store.arrow_export_store import ArrowExportStore
+from domain.export.store.base_export_store import BaseExportStore
+from domain.export.store.csv_export_store import CsvExportStore
+from domain.export.store.parquet_export_store import ParquetExportStore
+
+logger = logging.getLogger(__name__)
+
+
+class ExportStoreManager:
+
+    AVAILABLE_STORES: Dict[str, Type[BaseExportStore]] = {
+        "arrow": ArrowExportStore,
+        "parquet": ParquetExportStore,
+        "csv": CsvExportStore,
+        # Add more stores as needed
+    }
+
+    @classmethod
+    def get_store(cls, store_format: str) -> BaseExportStore:
+        if store_format in cls.AVAILABLE_STORES:
+            return cls.AVAILABLE_STORES[store_format]()
+        else:
+            raise ValueError(f"Export store format '{store_format}' is not available.")
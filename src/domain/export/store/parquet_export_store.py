@@ -0,0 +1,24 @@
+from typing import Dict
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from domain.export.store.base_export_store import BaseExportStore
+
+
+class ParquetExportStore(BaseExportStore):
+    """Compressed Parquet files, read with a memory map."""
+
+    _EXTENSION = "parquet"
+
+    @property
+    def extension(self) -> str:
+        return self._EXTENSION
+
+    def _write(self, data: pd.DataFrame, path: str) -> None:
+        table = pa.Table.from_pandas(self._normalize_object_columns(data.copy(deep=False)), preserve_index=False)
+        pq.write_table(table, path, compression="zstd")
+
+    def _read(self, path: str, schema: Dict[str, str]) -> pd.DataFrame:
+        return pq.read_table(path, memory_map=True).to_pandas(split_blocks=True)
@@ -0,0 +1,94 @@
+import logging
+import os
+import threading
+from typing import Dict, Set
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from domain.export.store.export_store_manager import ExportStoreManager
+from model.core.project.models import ProjectModel
+from model.core.url.models import UrlModel
+
+logger = logging.getLogger(__name__)
+
+
+class UrlDictionaryError(Exception):
+    pass
+
+
+class UrlDictionary:
+    """Per-project mapping of urls to integer ids, stored next to the exports.
+
+    The ids are the UrlModel primary keys, so exports and reports can join and deduplicate on integers while staying
+    consistent with the database. Urls are keyed exactly as UrlModel.full_address stores them.
+    """
+
+    _SCHEMA: Dict[str, str] = {"URL": "string", "URL_ID": "int64"}
+    _CHECK_SAMPLE_SIZE = 100  # stored entries compared with the database when the dictionary is loaded
+    _dictionaries: Dict[str, "UrlDictionary"] = {}
+    _dictionaries_lock = threading.Lock()
+
+    def __init__(self, project: ProjectModel):
+        self.store = ExportStoreManager.get_store(settings.EXPORT_STORE_FORMAT)
+        self.path = os.path.join(project.data_folder, "exports", f"url_dictionary.{self.store.extension}")
+        self._lock = threading.Lock()
+        self._ids = self._load()
+        # Urls the database rejects, e.g. longer than full_address allows; they map to <NA> without a new lookup
+        self._invalid_urls: Set[str] = set()
+
+    @classmethod
+    def for_project(cls, project: ProjectModel) -> "UrlDictionary":
+        """The dictionary shared by every export of the project."""
+        with cls._dictionaries_lock:
+            if project.data_folder not in cls._dictionaries:
+                cls._dictionaries[project.data_folder] = cls(project)
+            return cls._dictionaries[project.data_folder]
+
+    def _load(self) -> Dict[str, int]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            data = self.store.load(self.path, self._SCHEMA)
+        except Exception as e:
+            logger.error(f"Failed to load the url dictionary {self.path}: {e}")
+            return {}
+
+        ids = dict(zip(data["URL"].tolist(), data["URL_ID"].tolist()))
+        # A recreated database hands out different ids; start over rather than join on stale ones
+        sample = data.sample(min(len(data), self._CHECK_SAMPLE_SIZE), random_state=0)
+        stored_urls = dict(UrlModel.objects.filter(id__in=sample["URL_ID"].tolist()).values_list("id", "full_address"))
+        if any(stored_urls.get(url_id) != url for url, url_id in zip(sample["URL"], sample["URL_ID"])):
+            logger.warning(f"The url dictionary {self.path} does not match the database; rebuilding it.")
+            return {}
+        return ids
+
+    def _save(self) -> None:
+        data = pd.DataFrame({"URL": list(self._ids.keys()), "URL_ID": list(self._ids.values())})
+        self.store.save(data, self.path, self._SCHEMA)
+
+    def get_ids(self, urls: pd.Series) -> pd.Series:
+        """Map urls to their ids, registering unknown urls; missing and invalid urls map to <NA>.
+
+        Raises UrlDictionaryError when valid urls cannot be registered, rather than leaving them without an id.
+        """
+        codes, uniques = pd.factorize(urls)
+        with self._lock:
+            unknown_urls = [url for url in uniques if url not in self._ids and url not in self._invalid_urls]
+            if unknown_urls:
+                self._ids.update(UrlModel.objects.get_ids(unknown_urls))
+                unresolved_urls = [url for url in unknown_urls if url not in self._ids]
+                invalid_urls = {url for url in unresolved_urls if not UrlModel.objects.is_valid_full_address(url)}
+                if invalid_urls:
+                    logger.warning(f"[url dictionary] {len(invalid_urls)} invalid urls get no id")
+                    self._invalid_urls.update(invalid_urls)
+                if len(unresolved_urls) > len(invalid_urls):
+                    raise UrlDictionaryError(f"{len(unresolved_urls) - len(invalid_urls)} of {len(unknown_urls)} new urls could not be registered in the database")
+                if len(unknown_urls) > len(invalid_urls):
+                    self._save()
+                    logger.info(f"[url dictionary] {len(unknown_urls) - len(invalid_urls)} new urls, {len(self._ids)} in total")
+            unique_ids = pd.array([self._ids.get(url) for url in uniques] + [None], dtype="Int64")
+        # Missing values have code -1; point them at the trailing <NA>
+        codes = np.where(codes < 0, len(uniques), codes)
+        return pd.Series(unique_ids.take(codes), index=urls.index, name="URL_ID")
@@ -1,7 +1,7 @@
 import logging
 import os
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Any, Dict, Iterable
 
 import pandas as pd
 from django.db import models
@@ -14,6 +14,8 @@ logger = logging.getLogger(__name__)
 
 
 class BaseReport(ABC):
+    _LOAD_CHUNK_SIZE = 5000  # rows fetched per round trip when the report is read back from the database
+
     def __init__(self, project: ProjectModel):
         self.project = project
         self.export_manager = ExportManager(project)
@@ -65,36 +67,32 @@ class BaseReport(ABC):
         logger.info(f"[report saved] {self.save_path}")
 
     def _load_flat_from_db(self) -> pd.DataFrame:
-        # Start constructing the base queryset
-        queryset = self.model_class.objects.filter(project=self.project)
-
-        # Automatically prefetch all related fields
-        for field in self.model_class._meta.get_fields():
-            if field.is_relation and field.related_model is not None:
-                queryset = queryset.prefetch_related(field.name)
-
-        data_list = []
-        for obj in queryset:
-            data_dict = {}
-            for field in self.model_class._meta.fields:
-                field_name = field.name
-                value = getattr(obj, field_name)
-
-                # If the field is a ForeignKey, use its string representation
-                if field.get_internal_type() == "ForeignKey" and value is not None:
-                    value = str(value)
-
-                data_dict[field_name] = value
-
-            # Handle many-to-many fields separately if needed
-            for field in self.model_class._meta.many_to_many:
-                data_dict[field.name] = ", ".join(str(rel_obj) for rel_obj in getattr(obj, field.name).all())
-
-            data_list.append(data_dict)
-
-        # Convert the list of dictionaries to a DataFrame
-        df = pd.DataFrame(data_list)
-        return df
+        """Load the project's report rows in one joined query, showing relations by their display value."""
+        # Relations to models with a _DISPLAY_FIELD are joined in the query; others fall back to __str__ of their rows
+        paths: Dict[str, str] = {}
+        for field in self.model_class._meta.fields:
+            display_field = getattr(field.related_model, "_DISPLAY_FIELD", None) if field.is_relation else None
+            paths[field.name] = f"{field.name}__{display_field}" if display_field else field.attname
+        queryset = self.model_class.objects.filter(project=self.project).values_list(*paths.values())
+
+        # Rows are streamed straight into the columns of the frame
+        data = pd.DataFrame.from_records(queryset.iterator(chunk_size=self._LOAD_CHUNK_SIZE), columns=list(paths))
+        for field in self.model_class._meta.fields:
+            if field.is_relation and paths[field.name] == field.attname:
+                data[field.name] = data[field.name].map(self._get_display_values(field.related_model, data[field.name].dropna().unique()))
+
+        # Many-to-many relations are joined into one comma separated value per row
+        for field in self.model_class._meta.many_to_many:
+            related = self.model_class.objects.filter(project=self.project, **{f"{field.name}__isnull": False}).values_list("pk", f"{field.name}__pk")
+            related = pd.DataFrame.from_records(related.iterator(chunk_size=self._LOAD_CHUNK_SIZE), columns=["pk", "related_pk"])
+            related["related_pk"] = related["related_pk"].map(self._get_display_values(field.related_model, related["related_pk"].unique()))
+            data[field.name] = data["id"].map(related.groupby("pk")["related_pk"].agg(", ".join)).fillna("")
+        return data
+
+    @staticmethod
+    def _get_display_values(model: models.Model, ids: Iterable[Any]) -> Dict[Any, str]:
+        """The string representation of the given rows of a model, by id."""
+        return {instance.pk: str(instance) for instance in model.objects.filter(pk__in=list(ids))}
 
     def _push_updates_to_excel(self) -> None:
         data = self._load_flat_from_db()
@@ -113,7 +111,7 @@ class BaseReport(ABC):
                 if field in fk_fields:
                     related_model = fk_fields[field]
                     related_model_manager = related_model.objects
-                    fk_id = related_model_manager.get_instance(str(value))
+                    fk_id = related_model_manager.get_cached_instance(str(value))
                     if fk_id is not None:
                         query_kwargs[f"{field}_id"] = fk_id
                     else:
@@ -129,6 +127,7 @@ class BaseReport(ABC):
                         for field, value in update_fields.items():
                             setattr(db_entry, field, value)
                         db_entry.save()
+                        self.model_class.objects.identity_map.invalidate(db_entry)
                         logger.info(f"Updated database entry for {query_kwargs}")
                     else:
                         logger.info(f"No entry found matching {query_kwargs}, consider creating a new instance")
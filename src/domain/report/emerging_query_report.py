@@ -2,6 +2,7 @@ import logging
 
 import pandas as pd
 
+from domain.export.export_scheduler import ExportJob
 from domain.report.base_report import BaseReport
 from model.core.project.models import ProjectModel
 from model.report.emerging_query_report.models import EmergingQueryReportModel
@@ -25,10 +26,13 @@ class EmergingTopicsReport(BaseReport):
         return EmergingQueryReportModel
 
     def _collect_data(self) -> None:
-        self._export_data["googleasearchconsole_query_page_months_16_to_1_export"] = self.export_manager.get_data("googleasearchconsole_query_page_months_16_to_1_export")
-        self._export_data["googleasearchconsole_query_page_months_1_to_0_export"] = self.export_manager.get_data("googleasearchconsole_query_page_months_1_to_0_export")
-        self._export_data["googleasearchconsole_query_page_weeks_78_to_1_export"] = self.export_manager.get_data("googleasearchconsole_query_page_weeks_78_to_1_export")
-        self._export_data["googleasearchconsole_query_page_weeks_1_to_0_export"] = self.export_manager.get_data("googleasearchconsole_query_page_weeks_1_to_0_export")
+        jobs = [
+            ExportJob("googleasearchconsole_query_page_months_16_to_1_export"),
+            ExportJob("googleasearchconsole_query_page_months_1_to_0_export"),
+            ExportJob("googleasearchconsole_query_page_weeks_78_to_1_export"),
+            ExportJob("googleasearchconsole_query_page_weeks_1_to_0_export"),
+        ]
+        self._export_data.update(self.export_manager.get_data_many(jobs))
 
     def _prepare_data(self) -> None:
         new_topics_month = self._export_data["googleasearchconsole_query_page_months_1_to_0_export"][
@@ -80,7 +84,5 @@ class EmergingTopicsReport(BaseReport):
         self._report_data.drop(columns=base_columns, inplace=True)
 
     def _update_db(self) -> None:
-        for index, row in self._report_data.iterrows():
-            arguments = row.to_dict()
-            self.model_class.objects.push(**arguments)
-        logger.info(f"[database updated] {self.project.name}")
+        counts = self.model_class.objects.push_many(self._report_data)
+        logger.info(f"[database updated] {self.project.name}: {counts['created']} created, {counts['updated']} updated")
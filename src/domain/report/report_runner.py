@@ -1,7 +1,13 @@
+import logging
+
+from domain.export.export_manager import ExportManager
 from domain.report.emerging_query_report import EmergingTopicsReport
 from domain.report.url_inventory_report import UrlInventoryReport
+from model.base_model_manager import BaseModelManager
 from model.core.project.models import ProjectModel
 
+logger = logging.getLogger(__name__)
+
 # Register your report classes in a dictionary
 report_classes = {
     "url_inventory": UrlInventoryReport,
@@ -12,7 +18,10 @@ report_classes = {
 class ReportRunner:
     @staticmethod
     def run(project: ProjectModel) -> None:
+        BaseModelManager.identity_map.clear()
         for report_name, report_class in report_classes.items():
             print(f"Running {report_name} report for project {project.name}")
             report = report_class(project)
             report.generate()
+        logger.info(f"[export cache] {ExportManager.shared_cache.stats()}")
+        logger.info(f"[identity map] {BaseModelManager.identity_map.stats()}")
@@ -1,18 +1,31 @@
 import logging
+from typing import Dict
 
 import pandas as pd
 
+from domain.export.export_scheduler import ExportJob
 from domain.report.base_report import BaseReport
 from model.core.project.models import ProjectModel
-from model.core.url.models import UrlModelManager
 from model.report.url_inventory_report.models import UrlInventoryReportModel
 from operators.dataframe_operator import DataFrameOperator
+from operators.url_operator import UrlOperator
 
 logger = logging.getLogger(__name__)
 
 
 class UrlInventoryReport(BaseReport):
     _REPORT_NAME = "url_inventory_report"
+    # exports that contribute urls to the inventory, with the column holding the url
+    _URL_COLUMNS: Dict[str, str] = {
+        "semrush_analytics_organic_pages_domain": "URL",
+        "semrush_analytics_organic_positions_domain": "URL",
+        "semrush_analytics_backlinks_backlinks_domain": "Target url",
+        "screamingfrog_spider_crawl_export": "Address",
+        "screamingfrog_sitemap_crawl_export": "Address",
+        "googleanalytics_months_14_to_0_export": "FULL_ADDRESS",
+        "googleasearchconsole_page_months_16_to_0_export": "page",
+        "screamingfrog_list_crawl_export": "Address",
+    }
 
     def __init__(self, project: ProjectModel):
         super().__init__(project)
@@ -25,39 +38,56 @@ class UrlInventoryReport(BaseReport):
     def model_class(self) -> UrlInventoryReportModel:
         return UrlInventoryReportModel
 
+    def _get_unique_urls(self, export_data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Union of the urls found in the given exports, without fragmented urls, as URL and URL_ID columns."""
+        url_frames = [export_data[export_type][[url_column, "URL_ID"]].rename(columns={url_column: "URL"}) for export_type, url_column in self._URL_COLUMNS.items() if export_type in export_data]
+        if not url_frames:
+            return pd.DataFrame({"URL": pd.Series(dtype="string"), "URL_ID": pd.Series(dtype="Int64")})
+        unique_urls = pd.concat(url_frames, ignore_index=True)
+        unique_urls = unique_urls[~UrlOperator.is_fragmented(unique_urls["URL"])]  # drop fragmented urls
+        # Exports fail rather than leave a url without an id, so only empty urls lack one here
+        # Deduplicate on the integer ids rather than the url strings
+        return unique_urls.dropna(subset=["URL_ID"]).drop_duplicates("URL_ID", ignore_index=True)
+
     def _collect_data(self) -> None:
-        self._export_data["semrush_analytics_organic_pages_domain"] = self.export_manager.get_data("semrush_analytics_organic_pages_domain")
-        self._export_data["semrush_analytics_organic_positions_domain"] = self.export_manager.get_data("semrush_analytics_organic_positions_domain")
-        self._export_data["semrush_analytics_backlinks_backlinks_domain"] = self.export_manager.get_data("semrush_analytics_backlinks_backlinks_domain")
-        self._export_data["screamingfrog_spider_crawl_export"] = self.export_manager.get_data("screamingfrog_spider_crawl_export")
-        self._export_data["screamingfrog_sitemap_crawl_export"] = self.export_manager.get_data("screamingfrog_sitemap_crawl_export")
-        self._export_data["googleanalytics_months_14_to_0_export"] = self.export_manager.get_data("googleanalytics_months_14_to_0_export")
-        self._export_data["googleasearchconsole_page_months_16_to_0_export"] = self.export_manager.get_data("googleasearchconsole_page_months_16_to_0_export")
+        source_exports = [
+            "semrush_analytics_organic_pages_domain",
+            "semrush_analytics_organic_positions_domain",
+            "semrush_analytics_backlinks_backlinks_domain",
+            "screamingfrog_spider_crawl_export",
+            "screamingfrog_sitemap_crawl_export",
+            "googleanalytics_months_14_to_0_export",
+            "googleasearchconsole_page_months_16_to_0_export",
+        ]
+        jobs = [ExportJob(export_type) for export_type in source_exports]
+        # final list crawl of every url the sources know about
+        jobs.append(
+            ExportJob(
+                "screamingfrog_list_crawl_export",
+                depends_on=source_exports,
+                kwargs_factory=lambda results: {"urls": self._get_unique_urls(results)["URL"].tolist()},
+            )
+        )
+        # fetch every url, including those only found by the list crawl
+        jobs.append(
+            ExportJob(
+                "url_inventory_report",
+                depends_on=source_exports + ["screamingfrog_list_crawl_export"],
+                kwargs_factory=lambda results: {"urls": self._get_unique_urls(results)["URL"].tolist()},
+            )
+        )
+        self._export_data.update(self.export_manager.get_data_many(jobs))
 
     def _prepare_data(self) -> None:
-        urls = []
-        urls.extend(self._export_data["semrush_analytics_organic_pages_domain"]["URL"].tolist())
-        urls.extend(self._export_data["semrush_analytics_organic_positions_domain"]["URL"].tolist())
-        urls.extend(self._export_data["semrush_analytics_backlinks_backlinks_domain"]["Target url"].tolist())
-        urls.extend(self._export_data["screamingfrog_spider_crawl_export"]["Address"].tolist())
-        urls.extend(self._export_data["screamingfrog_sitemap_crawl_export"]["Address"].tolist())
-        urls.extend(self._export_data["googleanalytics_months_14_to_0_export"]["FULL_ADDRESS"].tolist())
-        urls.extend(self._export_data["googleasearchconsole_page_months_16_to_0_export"]["page"].tolist())
-        # prepare for final list crawl
-        unique_urls = list(set(urls))
-        unique_urls = [url for url in unique_urls if not UrlModelManager.is_fragmented(url)]  # drop fragmented urls
-        self._export_data["screamingfrog_list_crawl_export"] = self.export_manager.get_data("screamingfrog_list_crawl_export", urls=unique_urls)
-        # collect list crawl data
-        urls.extend(self._export_data["screamingfrog_list_crawl_export"]["Address"].tolist())
         # set report base
-        unique_urls = list(set(urls))
-        unique_urls = [url for url in unique_urls if not UrlModelManager.is_fragmented(url)]  # drop fragmented urls
-        self._export_data["url_inventory_report"] = self.export_manager.get_data("url_inventory_report", urls=unique_urls)  # Initialize _report_base DataFrame with columns from UrlInventoryReportModel
+        unique_urls = self._get_unique_urls(self._export_data).reset_index(drop=True)
+        # Initialize _report_base DataFrame with columns from UrlInventoryReportModel
         model_fields = self.model_class.objects.get_field_names()  # Use your method to get field names
-        model_fields.append("BASE_URL")  # Add BASE_URL to the list of columns
+        model_fields.extend(["BASE_URL", "BASE_URL_ID"])  # Add BASE_URL and BASE_URL_ID to the list of columns
         self._report_base = pd.DataFrame(columns=model_fields)
-        # Populate BASE_URL column with unique URLs
-        self._report_base["BASE_URL"] = pd.Series(unique_urls)
+        # Populate BASE_URL and BASE_URL_ID columns with unique URLs
+        self._report_base["BASE_URL"] = unique_urls["URL"]
+        self._report_base["BASE_URL_ID"] = unique_urls["URL_ID"]
 
     # def _process_data(self) -> None:
     #     # Merge _report_base with _export_data["url_inventory_report"] on matching URLs
@@ -80,7 +110,7 @@ class UrlInventoryReport(BaseReport):
     #     self._report_data = self._report_base.copy()
 
     def _process_data(self) -> None:
-        self._report_base = DataFrameOperator.update_df_from_df(self._report_base, self._export_data["url_inventory_report"], "BASE_URL", "request_url")
+        self._report_base = DataFrameOperator.update_df_from_df(self._report_base, self._export_data["url_inventory_report"], "BASE_URL_ID", "URL_ID")
         self._report_data = self._report_base.copy()
 
     def _finalize(self) -> None:
@@ -90,7 +120,5 @@ class UrlInventoryReport(BaseReport):
         self._report_data.drop(columns=base_columns, inplace=True)
 
     def _update_db(self) -> None:
-        for index, row in self._report_data.iterrows():
-            arguments = row.to_dict()
-            self.model_class.objects.push(**arguments)
-        logger.info(f"[database updated] {self.project.name}")
+        counts = self.model_class.objects.push_many(self._report_data)
+        logger.info(f"[database updated] {self.project.name}: {counts['created']} created, {counts['updated']} updated")
@@ -1,14 +1,23 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Tuple, Type, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
 
+import numpy as np
 import pandas as pd
-from django.db import models
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, models, transaction
+
+from model.identity_map import IdentityMap
 
 logger = logging.getLogger(__name__)
 
 
 class BaseModelManager(models.Manager, ABC):
+    _ID_CHUNK_SIZE = 900  # stays below SQLite's limit on query parameters
+    # get_instance results of all managers, cleared at the start of every report run
+    identity_map = IdentityMap()
+
     def __init__(self, *args: Tuple[Any, ...], **kwargs: Dict[str, Any]) -> None:
         super().__init__(*args, **kwargs)
 
@@ -36,7 +45,12 @@ class BaseModelManager(models.Manager, ABC):
 
                 if not isinstance(related_data, models.Model):
                     if hasattr(related_manager, "get_instance"):
-                        related_instance = related_manager.get_instance(related_data)
+                        related_instance = related_manager.get_cached_instance(related_data)
+                        if related_instance is None:
+                            related_instance = related_manager.create_instance(related_data)
+                        if related_instance is None:
+                            logger.error(f"Could not find or create the {field.related_model.__name__} for field {field.name}: {related_data}")
+                            return None
                         logger.debug(f"Related instance ID for field {field.name}: {related_instance.id}")
                         kwargs[field.name] = related_instance
                     else:
@@ -50,6 +64,7 @@ class BaseModelManager(models.Manager, ABC):
 
         try:
             model_instance, created = self.model.objects.update_or_create(defaults=kwargs, **identifying_fields)
+            self.identity_map.invalidate(model_instance)
             if created:
                 logger.debug(f"[{self.model.__name__} created] {model_instance}")
             else:
@@ -61,6 +76,146 @@ class BaseModelManager(models.Manager, ABC):
         logger.debug("Exiting push method")
         return None
 
+    def push_many(self, data: pd.DataFrame, chunk_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        Upsert the rows of a frame in bulk, keyed on the model's identifying fields.
+
+        Relation columns may hold instances, ids or natural keys; each distinct value is resolved once. The rows are
+        written with one INSERT ... ON CONFLICT DO UPDATE per chunk, all in one transaction.
+
+        :return: The number of created and updated rows.
+        """
+        counts = {"created": 0, "updated": 0}
+        chunk_size = chunk_size or settings.DB_BULK_CHUNK_SIZE
+        identifying_fields = self.get_identifying_fields()
+        manual_fields = getattr(self.model, "_MANUAL_FIELDS", [])
+        # The primary key and the auto timestamps are never taken from the frame
+        fields = [field for field in self.model._meta.concrete_fields if field.name in data.columns and not field.primary_key and not getattr(field, "auto_now", False) and not getattr(field, "auto_now_add", False)]
+        auto_now_fields = [field.name for field in self.model._meta.concrete_fields if getattr(field, "auto_now", False)]
+
+        rows = data[[field.name for field in fields]].copy()
+        for field in fields:
+            if field.is_relation:
+                rows[field.name] = self._resolve_foreign_keys(field, rows[field.name])
+        rows = self._convert_field_values(fields, rows)
+        # Rows missing a value the table requires would fail the whole transaction; they are skipped like a failed push
+        required_fields = [field.name for field in fields if not field.null and not field.has_default()]
+        complete = rows[list(dict.fromkeys(identifying_fields + required_fields))].notna().all(axis=1)
+        if not complete.all():
+            logger.warning(f"Skipping {(~complete).sum()} {self.model.__name__} rows without identifying or required values")
+        rows = rows[complete].drop_duplicates(subset=identifying_fields, keep="last")
+
+        # Like push, a missing value never overwrites a stored one: rows are upserted in groups sharing their set of
+        # non-null columns, and only those columns are updated. Manual fields are only written when a row is created.
+        present = rows.notna().to_numpy()
+        patterns = present @ (1 << np.arange(len(fields), dtype=np.int64)) if fields else np.zeros(len(rows), dtype=np.int64)
+        key_attnames = [self.model._meta.get_field(name).attname for name in identifying_fields]
+        try:
+            with transaction.atomic():
+                for pattern, group in rows.groupby(patterns, sort=False):
+                    group_fields = [field for position, field in enumerate(fields) if pattern >> position & 1]
+                    update_fields = [field.name for field in group_fields if field.name not in identifying_fields and field.name not in manual_fields]
+                    update_fields += auto_now_fields
+                    records = group[[field.name for field in group_fields]].astype(object).to_dict("records")
+                    for start in range(0, len(records), chunk_size):
+                        chunk = [self.model(**{field.attname: record[field.name] for field in group_fields}) for record in records[start : start + chunk_size]]
+                        keys = [tuple(getattr(instance, attname) for attname in key_attnames) for instance in chunk]
+                        existing_count = len(self._get_existing_keys(key_attnames, keys))
+                        if update_fields:
+                            self.bulk_create(chunk, update_conflicts=True, unique_fields=identifying_fields, update_fields=update_fields)
+                        else:
+                            # Nothing to update; stored rows are left as they are
+                            self.bulk_create(chunk, ignore_conflicts=True)
+                        counts["created"] += len(chunk) - existing_count
+                        counts["updated"] += existing_count if update_fields else 0
+        except (DatabaseError, ValueError, TypeError, ValidationError) as e:
+            logger.error(f"Bulk push of {len(rows)} {self.model.__name__} rows failed and was rolled back: {e}")
+            return {"created": 0, "updated": 0}
+        finally:
+            self.identity_map.invalidate_model(self.model)
+
+        logger.info(f"[{self.model.__name__} bulk push] {counts['created']} created, {counts['updated']} updated")
+        return counts
+
+    def _convert_field_values(self, fields: List[models.Field], rows: pd.DataFrame) -> pd.DataFrame:
+        """Convert the value columns to their model field types, dropping the rows holding a value a field rejects."""
+        invalid = np.zeros(len(rows), dtype=bool)
+        for field in fields:
+            if field.is_relation:
+                continue
+            converted = []
+            for position, value in enumerate(rows[field.name]):
+                if pd.api.types.is_scalar(value) and pd.isna(value):
+                    converted.append(None)
+                    continue
+                try:
+                    value = field.to_python(value)
+                    field.get_prep_value(value)
+                except (ValueError, TypeError, ValidationError) as e:
+                    logger.warning(f"Invalid {field.name} value {value!r} for {self.model.__name__}: {e}")
+                    invalid[position] = True
+                    value = None
+                converted.append(value)
+            rows[field.name] = pd.Series(converted, index=rows.index, dtype=object)
+        if invalid.any():
+            logger.warning(f"Skipping {invalid.sum()} {self.model.__name__} rows with invalid values")
+        return rows[~invalid]
+
+    def _get_existing_keys(self, key_attnames: List[str], keys: List[Tuple[Any, ...]]) -> set:
+        """The given identifying value tuples that are already stored."""
+        lookups = {f"{attname}__in": list({key[position] for key in keys}) for position, attname in enumerate(key_attnames)}
+        return set(self.filter(**lookups).values_list(*key_attnames)) & set(keys)
+
+    @staticmethod
+    def _resolve_foreign_keys(field: models.Field, values: pd.Series) -> pd.Series:
+        """Map a relation column holding instances, ids or natural keys to primary keys; unresolved values map to <NA>."""
+        if pd.api.types.is_integer_dtype(values):
+            return values.astype("Int64")
+        ids: Dict[Any, int] = {}
+        natural_keys = []
+        for value in values.dropna().unique():
+            if isinstance(value, models.Model):
+                ids[value] = value.pk
+            elif isinstance(value, (int, np.integer)):
+                ids[value] = int(value)
+            else:
+                natural_keys.append(value)
+        if natural_keys:
+            ids.update(field.related_model.objects.get_ids(natural_keys))
+        return values.map(ids).astype("Int64")
+
+    def get_ids(self, keys: Iterable[Any]) -> Dict[Any, int]:
+        """Return the ids of the instances with the given natural keys, looking each distinct key up once and creating the missing ones."""
+        ids: Dict[Any, int] = {}
+        for key in dict.fromkeys(keys):
+            instance = self.get_cached_instance(key)
+            if instance is None:
+                instance = self.create_instance(key)
+            if isinstance(instance, models.Model):
+                instance = instance.pk
+            if instance is not None:
+                ids[key] = instance
+        return ids
+
+    def _get_or_create_ids(self, key_field: str, keys: Iterable[Any]) -> Dict[Any, int]:
+        """Return the ids of the instances with the given values of a unique field, creating the missing ones in bulk."""
+        keys = list(dict.fromkeys(keys))
+        ids: Dict[Any, int] = {}
+        for start in range(0, len(keys), self._ID_CHUNK_SIZE):
+            chunk = keys[start : start + self._ID_CHUNK_SIZE]
+            ids.update(self.model.objects.filter(**{f"{key_field}__in": chunk}).values_list(key_field, "id"))
+            missing = [key for key in chunk if key not in ids]
+            if not missing:
+                continue
+            try:
+                # Other processes may insert the same keys meanwhile; the ids are read back either way
+                self.model.objects.bulk_create([self.model(**{key_field: key}) for key in missing], ignore_conflicts=True)
+            except DatabaseError as e:
+                logger.error(f"Failed to create {len(missing)} {self.model.__name__} instances: {e}")
+                continue
+            ids.update(self.model.objects.filter(**{f"{key_field}__in": missing}).values_list(key_field, "id"))
+        return ids
+
     # def push(self, **kwargs: Any) -> Optional[models.Model]:
     #     logger.debug(f"Entering push method of {self.__class__.__name__} with kwargs: {kwargs}")
     #     kwargs = {k: v for k, v in kwargs.items() if not pd.isna(v)}
@@ -168,6 +323,15 @@ class BaseModelManager(models.Manager, ABC):
     def get_instance(self, instance_str: str) -> int:
         pass
 
+    def create_instance(self, lookup: Any) -> Any:
+        """Create the instance of a get_instance lookup that found nothing; only managers of implicitly created models do."""
+        return None
+
+    def get_cached_instance(self, lookup: Any) -> Any:
+        """get_instance through the identity map, so each natural key reaches the database once per run."""
+        # get_instance implementations may rewrite a lookup dictionary in place
+        return self.identity_map.get_or_load(self.model, lookup, lambda: self.get_instance(dict(lookup) if isinstance(lookup, dict) else lookup))
+
     def get_field_names(self) -> List[str]:
         return [field.name for field in self.model._meta.fields]
 
@@ -63,6 +63,7 @@ class ProjectModel(models.Model):
         "website",
         "data_folder",
     ]
+    _DISPLAY_FIELD = "name"  # same value as __str__
     # required relations
     website = models.ForeignKey(WebsiteModel, on_delete=models.CASCADE, related_name="websites")
     # required fields
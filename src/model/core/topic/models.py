@@ -1,4 +1,5 @@
 import logging
+from typing import Dict, Iterable
 
 from django.db import models
 
@@ -36,6 +37,10 @@ class TopicModelManager(BaseModelManager):
     def get_all(self) -> models.QuerySet:
         return self.model.objects.all()
 
+    def get_ids(self, phrases: Iterable[str]) -> Dict[str, int]:
+        """Return the ids of the given topics, creating the missing ones in bulk."""
+        return self._get_or_create_ids("phrase", phrases)
+
     def get_instance(self, instance_str: str) -> int:
         try:
             return self.model.objects.get(phrase=instance_str).id
@@ -48,6 +53,7 @@ class TopicModel(models.Model):
     IDENTIFYING_FIELDS = [
         "phrase",
     ]
+    _DISPLAY_FIELD = "phrase"  # same value as __str__
     # required relations
     # required fields
     phrase = models.CharField(max_length=255, unique=True)  # required
@@ -1,7 +1,8 @@
 import logging
-from typing import List
+from typing import Any, Dict, Iterable, List, Optional, Union
 from urllib.parse import urljoin, urlparse
 
+from django.core.exceptions import ValidationError
 from django.db import models
 
 from model.base_model_manager import BaseModelManager
@@ -10,7 +11,6 @@ logger = logging.getLogger(__name__)
 
 
 class UrlModelManager(BaseModelManager):
-
     # @staticmethod
     # def push(**kwargs: Dict[str, Any]) -> "UrlModel":
     #     # Validate identifying fields
@@ -63,25 +63,50 @@ class UrlModelManager(BaseModelManager):
     def is_fragmented(url: str) -> bool:
         return bool(urlparse(url).fragment)
 
-    def get_instance(self, data) -> int:
+    def is_valid_full_address(self, full_address: str) -> bool:
+        """Whether a url passes the full_address validators, e.g. fits its max_length."""
+        try:
+            self.model._meta.get_field("full_address").clean(full_address, None)
+        except ValidationError:
+            return False
+        return True
+
+    def get_ids(self, full_addresses: Iterable[str]) -> Dict[str, int]:
+        """Return the ids of the given urls, creating the missing ones in bulk; invalid urls are skipped with a warning."""
+        valid_addresses = []
+        for full_address in dict.fromkeys(full_addresses):
+            if self.is_valid_full_address(full_address):
+                valid_addresses.append(full_address)
+            else:
+                logger.warning(f"Skipping invalid url '{full_address}'")
+        return self._get_or_create_ids("full_address", valid_addresses)
+
+    @staticmethod
+    def _get_lookup_fields(data: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """The UrlModel fields of a lookup given as a url or as a dictionary keyed by a relation to urls."""
+        if isinstance(data, str):
+            return {"full_address": data}
+        data = dict(data)
         if "root_url" in data:
             data["full_address"] = data.pop("root_url")
         if "sitemap_url" in data:
             data["full_address"] = data.pop("sitemap_url")
+        return {k: v for k, v in data.items() if v is not None}
 
-        kwargs = {k: v for k, v in data.items() if v is not None}
-        try:
-            return self.model.objects.push(**kwargs)
-        except self.model.DoesNotExist:
-            full_address = data.get("full_address")
-            logger.error(f"UrlModel instance with full_address '{full_address}' does not exist.")
-            return None
+    def get_instance(self, data: Union[str, Dict[str, Any]]) -> Optional["UrlModel"]:
+        """Read the url of a lookup; a missing url is not created here but by create_instance."""
+        return self.model.objects.filter(**self._get_lookup_fields(data)).first()
+
+    def create_instance(self, data: Union[str, Dict[str, Any]]) -> Optional["UrlModel"]:
+        return self.model.objects.push(**self._get_lookup_fields(data))
 
 
 class UrlModel(models.Model):
     _IDENTIFYING_FIELDS = [
         "full_address",
     ]
+    # Value shown for relations to this model in flat report exports, as a lookup path; matches __str__
+    _DISPLAY_FIELD = "full_address"
     # required relations
     # required fields
     full_address = models.URLField(max_length=200, unique=True)  # required
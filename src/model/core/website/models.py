@@ -1,4 +1,5 @@
 import logging
+from typing import Any, Dict, Optional, Union
 
 from django.db import models
 
@@ -48,23 +49,34 @@ class WebsiteModelManager(BaseModelManager):
     def get_all() -> models.QuerySet:
         return WebsiteModel.objects.all()
 
-    def get_instance(self, data) -> int:
+    @staticmethod
+    def _get_lookup_fields(data: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """The WebsiteModel fields of a lookup given as a root url or as a dictionary."""
+        if isinstance(data, str):
+            return {"root_url": data}
+        data = dict(data)
         if "website" in data:
             data["root_url"] = data.pop("website")
+        return {k: v for k, v in data.items() if v is not None}
 
-        kwargs = {k: v for k, v in data.items() if v is not None}
-        try:
-            return self.model.objects.push(**kwargs)
-        except self.model.DoesNotExist:
-            root_url = data.get("root_url")
-            logger.error(f"WebsiteModel instance with root_url '{root_url}' does not exist.")
+    def get_instance(self, data: Union[str, Dict[str, Any]]) -> Optional["WebsiteModel"]:
+        """Read the website of a lookup; a missing website is not created here but by create_instance."""
+        root_url = self._get_lookup_fields(data).get("root_url")
+        if root_url is None:
             return None
+        if isinstance(root_url, (UrlModel, int)):
+            return self.model.objects.filter(root_url=root_url).first()
+        return self.model.objects.filter(root_url__full_address=root_url).first()
+
+    def create_instance(self, data: Union[str, Dict[str, Any]]) -> Optional["WebsiteModel"]:
+        return self.model.objects.push(**self._get_lookup_fields(data))
 
 
 class WebsiteModel(models.Model):
     _IDENTIFYING_FIELDS = [
         "root_url",
     ]
+    _DISPLAY_FIELD = "root_url__full_address"  # same value as __str__
     # required relations
     root_url = models.OneToOneField(UrlModel, on_delete=models.CASCADE, related_name="root_url")  # required
     sitemap_url = models.ForeignKey(UrlModel, on_delete=models.CASCADE, related_name="sitemap_url", null=True, blank=True)
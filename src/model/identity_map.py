@@ -0,0 +1,93 @@
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from django.db import models
+
+logger = logging.getLogger(__name__)
+
+EntryKey = Tuple[str, Hashable]
+
+
+class IdentityMap:
+    """Per-run cache of model lookups by natural key, shared by all model managers.
+
+    Lookups that found nothing are not cached, so rows created later are still seen. A write to a row drops the entries
+    that resolved to it, and a bulk write drops every entry of the model.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[EntryKey, Any] = {}
+        # Entries by the primary key they resolved to, so a write to a row can drop them
+        self._keys_by_pk: Dict[Tuple[str, Any], Set[EntryKey]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(model: models.Model, lookup: Any) -> EntryKey:
+        """Build an entry key from the model and a lookup value or dictionary of lookup values."""
+        if isinstance(lookup, dict):
+            lookup = tuple(sorted(lookup.items()))
+        return model._meta.label, lookup
+
+    @staticmethod
+    def _get_pk(value: Any) -> Any:
+        return value.pk if isinstance(value, models.Model) else value
+
+    def get_or_load(self, model: models.Model, lookup: Any, loader: Callable[[], Any]) -> Optional[Any]:
+        """Return the cached result of a lookup, calling loader on a miss."""
+        key = self.make_key(model, lookup)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = loader()
+        if value is not None:
+            with self._lock:
+                self._entries[key] = value
+                self._keys_by_pk[(key[0], self._get_pk(value))].add(key)
+        return value
+
+    def invalidate(self, instance: models.Model) -> None:
+        """Drop the entries that resolved to a written row."""
+        with self._lock:
+            keys = self._keys_by_pk.pop((instance._meta.label, instance.pk), set())
+            for key in keys:
+                self._entries.pop(key, None)
+            self.invalidations += len(keys)
+
+    def invalidate_model(self, model: models.Model) -> None:
+        """Drop every entry of a model, after writes that bypass the instances."""
+        label = model._meta.label
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == label]
+            for key in keys:
+                self._entries.pop(key)
+            for pk_key in [pk_key for pk_key in self._keys_by_pk if pk_key[0] == label]:
+                del self._keys_by_pk[pk_key]
+            self.invalidations += len(keys)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters, at the start of a run."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_pk.clear()
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+            }
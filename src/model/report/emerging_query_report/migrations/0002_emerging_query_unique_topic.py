@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:44
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("emerging_query_report", "0001_initial"),
+        ("project", "0001_initial"),
+        ("topic", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="emergingqueryreportmodel",
+            unique_together={("project", "topic")},
+        ),
+    ]
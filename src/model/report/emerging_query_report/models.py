@@ -108,3 +108,8 @@ class EmergingQueryReportModel(models.Model):
 
     class Meta:
         db_table = "report_emerging_query"
+
+        unique_together = (
+            "project",
+            "topic",
+        )
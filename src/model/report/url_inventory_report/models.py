@@ -1,5 +1,5 @@
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import pandas as pd
 from django.core.exceptions import ValidationError
@@ -7,7 +7,7 @@ from django.db import IntegrityError, models
 
 from model.base_model_manager import BaseModelManager
 from model.core.project.models import ProjectModel
-from model.core.url.models import UrlModel, UrlModelManager
+from model.core.url.models import UrlModel
 
 logger = logging.getLogger(__name__)
 
@@ -21,26 +21,20 @@ class UrlInventoryReportModelManager(BaseModelManager):
             logger.error("No 'request_url' provided to push method")
             return None
 
-        request_url_model = UrlModelManager.push(full_address=request_url)
-        if request_url_model is None:
-            logger.error(f"Failed to obtain 'UrlModel' for request_url: {request_url}")
-            return None
-        kwargs["request_url"] = request_url_model
-
-        # Validate 'response_url'
+        # Resolve both urls with one lookup; a missing response url means the request was not redirected
         response_url = kwargs.pop("response_url", None)
-        if response_url and response_url != request_url:
-            response_url_model = UrlModelManager.push(full_address=response_url)
-            if response_url_model is None:
-                logger.error(f"Failed to obtain 'UrlModel' for response_url: {response_url}")
-                return None
-            kwargs["response_url"] = response_url_model
-        else:
-            kwargs["response_url"] = request_url_model
+        if not response_url or pd.isna(response_url):
+            response_url = request_url
+        url_ids = UrlModel.objects.get_ids([request_url, response_url])
+        if request_url not in url_ids or response_url not in url_ids:
+            logger.error(f"Failed to obtain 'UrlModel' ids for request_url: {request_url}, response_url: {response_url}")
+            return None
+        kwargs["request_url_id"] = url_ids[request_url]
+        kwargs["response_url_id"] = url_ids[response_url]
 
         # Validate identifying fields
-        identifying_fields = {field: kwargs.pop(field) for field in UrlInventoryReportModel.objects.get_identifying_fields() if field in kwargs}
-        if not identifying_fields:
+        identifying_fields = {field: kwargs.pop(field) for field in ["project", "request_url_id"] if field in kwargs}
+        if "project" not in identifying_fields:
             logger.error("No identifying fields provided for UrlInventoryReportModel")
             return None
 
@@ -62,6 +56,19 @@ class UrlInventoryReportModelManager(BaseModelManager):
 
         return None
 
+    def push_many(self, data: pd.DataFrame, chunk_size: Optional[int] = None) -> Dict[str, int]:
+        """Resolve the request and response urls of all rows in one bulk pass, then upsert the rows."""
+        data = data.copy()
+        # A missing response url means the request was not redirected
+        response_urls = data["response_url"].fillna("") if "response_url" in data.columns else pd.Series("", index=data.index)
+        data["response_url"] = response_urls.where(response_urls != "", data["request_url"])
+
+        urls = pd.concat([data["request_url"], data["response_url"]]).dropna().unique()
+        url_ids = UrlModel.objects.get_ids(urls)
+        for column in ["request_url", "response_url"]:
+            data[column] = data[column].map(url_ids).astype("Int64")
+        return super().push_many(data, chunk_size)
+
     @staticmethod
     def get_all() -> models.QuerySet:
         return UrlInventoryReportModel.objects.all()
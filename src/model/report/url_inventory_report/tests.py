@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from django.test import TestCase
+
+from model.core.project.models import ProjectModel
+from model.core.url.models import UrlModel
+from model.core.website.models import WebsiteModel
+from model.report.url_inventory_report.models import UrlInventoryReportModel
+
+
+class UrlInventoryReportPushManyTest(TestCase):
+    def setUp(self) -> None:
+        website = WebsiteModel.objects.create(root_url=UrlModel.objects.create(full_address="https://example.com/"))
+        self.project = ProjectModel.objects.create(website=website, name="example", data_folder="/tmp/example")
+
+    def _report_data(self, status_code: int) -> pd.DataFrame:
+        # Reports build their frame from every model field, so the manual note column is present and empty
+        data = pd.DataFrame(columns=UrlInventoryReportModel.objects.get_field_names())
+        data["request_url"] = ["https://example.com/a", "https://example.com/b"]
+        data["project"] = self.project
+        data["status_code"] = status_code
+        data["note"] = np.nan
+        return data
+
+    def test_upsert_keeps_stored_note(self) -> None:
+        UrlInventoryReportModel.objects.push_many(self._report_data(200))
+        UrlInventoryReportModel.objects.filter(request_url__full_address="https://example.com/a").update(note="keep me")
+
+        counts = UrlInventoryReportModel.objects.push_many(self._report_data(404))
+
+        self.assertEqual(counts, {"created": 0, "updated": 2})
+        row = UrlInventoryReportModel.objects.get(request_url__full_address="https://example.com/a")
+        self.assertEqual(row.note, "keep me")
+        self.assertEqual(row.status_code, 404)
+
+    def test_manual_field_is_not_overwritten(self) -> None:
+        UrlInventoryReportModel.objects.push_many(self._report_data(200))
+        UrlInventoryReportModel.objects.update(note="from excel")
+
+        data = self._report_data(200)
+        data["note"] = "stale"
+        UrlInventoryReportModel.objects.push_many(data)
+
+        self.assertEqual(set(UrlInventoryReportModel.objects.values_list("note", flat=True)), {"from excel"})
+
+    def test_invalid_status_code_skips_only_its_row(self) -> None:
+        data = self._report_data(200)
+        data["status_code"] = pd.Series([301, "Unknown"], index=data.index, dtype=object)
+
+        counts = UrlInventoryReportModel.objects.push_many(data)
+
+        self.assertEqual(counts, {"created": 1, "updated": 0})
+        row = UrlInventoryReportModel.objects.get()
+        self.assertEqual(row.request_url.full_address, "https://example.com/a")
+        self.assertEqual(row.status_code, 301)
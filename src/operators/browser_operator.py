@@ -1,16 +1,100 @@
+import logging
+import os
+import threading
+from typing import Any, List, Optional, Tuple, Union
+
+from django.conf import settings
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from seleniumwire import webdriver
+from seleniumwire.utils import decode
 from webdriver_manager.chrome import ChromeDriverManager
 
+logger = logging.getLogger(__name__)
+
 
 class BrowserOperator:
-    def __init__(self):
+    _driver_path: Optional[str] = None
+    _driver_path_lock = threading.Lock()
+
+    # Sec-Fetch-Dest values behind each blockable resource type
+    _RESOURCE_DESTINATIONS = {
+        "image": {"image"},
+        "font": {"font"},
+        "media": {"audio", "video", "track"},
+        "style": {"style"},
+        "script": {"script"},
+    }
+
+    def __init__(self, page_load_timeout: Optional[int] = None, blocked_resources: Optional[List[str]] = None, blocked_hosts: Optional[List[str]] = None):
         options = Options()
         options.add_argument("--headless")  # Ensure GUI is off
         options.add_argument("--disable-cache")  # Disable caching
-        # Initialize the WebDriver with ChromeDriverManager
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), chrome_options=options)
+        # selenium-wire stores nothing; document responses are captured per navigation by the response interceptor
+        seleniumwire_options = {"request_storage": "memory", "request_storage_max_size": 0}
+        # Initialize the WebDriver with the ChromeDriver resolved once per machine
+        self.driver = webdriver.Chrome(service=Service(self.get_driver_path()), chrome_options=options, seleniumwire_options=seleniumwire_options)
+        if page_load_timeout:
+            self.driver.set_page_load_timeout(page_load_timeout)
+
+        blocked_resources = settings.BROWSER_BLOCKED_RESOURCES if blocked_resources is None else blocked_resources
+        self._blocked_destinations = set().union(*(self._RESOURCE_DESTINATIONS.get(resource, {resource}) for resource in blocked_resources))
+        self._blocked_hosts = tuple(settings.BROWSER_BLOCKED_HOSTS if blocked_hosts is None else blocked_hosts)
+
+        self._documents: List[Tuple[str, Any]] = []
+        self._documents_lock = threading.Lock()
+        self.driver.request_interceptor = self._intercept_request
+        self.driver.response_interceptor = self._intercept_response
+
+    @classmethod
+    def get_driver_path(cls) -> str:
+        """Resolve the ChromeDriver binary once and remember it on disk, so later runs work offline."""
+        with cls._driver_path_lock:
+            if cls._driver_path and os.path.exists(cls._driver_path):
+                return cls._driver_path
+
+            if settings.CHROMEDRIVER_PATH:
+                cls._driver_path = settings.CHROMEDRIVER_PATH
+                return cls._driver_path
+
+            record_path = os.path.join(settings.CACHE_DIR, "chromedriver_path.txt")
+            if os.path.exists(record_path):
+                with open(record_path, "r", encoding="utf-8") as file:
+                    recorded_path = file.read().strip()
+                if os.path.exists(recorded_path):
+                    cls._driver_path = recorded_path
+                    return cls._driver_path
+
+            cls._driver_path = ChromeDriverManager().install()
+            os.makedirs(settings.CACHE_DIR, exist_ok=True)
+            with open(record_path, "w", encoding="utf-8") as file:
+                file.write(cls._driver_path)
+            logger.info(f"ChromeDriver resolved to {cls._driver_path}")
+            return cls._driver_path
+
+    def _is_blocked(self, request) -> bool:
+        if request.headers.get("Sec-Fetch-Dest") in self._blocked_destinations:
+            return True
+        host = request.host.lower()
+        return any(host == blocked_host or host.endswith(f".{blocked_host}") for blocked_host in self._blocked_hosts)
+
+    def _intercept_request(self, request) -> None:
+        # Runs on the selenium-wire proxy thread for every request the page makes
+        if self._is_blocked(request):
+            request.abort()
+
+    @staticmethod
+    def _is_document(request, response) -> bool:
+        destination = request.headers.get("Sec-Fetch-Dest")
+        if destination is not None:
+            return destination == "document"
+        return (response.headers.get("Content-Type") or "").startswith("text/html")
+
+    def _intercept_response(self, request, response) -> None:
+        # Keep only the main document chain (including redirects) of the current navigation
+        if self._is_document(request, response):
+            with self._documents_lock:
+                self._documents.append((request.url, response))
 
     def get_page_contents(self, url: str) -> str:
         """
@@ -19,9 +103,48 @@ class BrowserOperator:
         :param url: The URL to navigate to.
         :return: The page contents as a string.
         """
+        with self._documents_lock:
+            self._documents = []
         self.driver.get(url)
         return self.driver.page_source
 
+    def get_response(self, url: str):
+        """Return the last document response captured for a url during the current navigation, or None."""
+        with self._documents_lock:
+            for document_url, response in reversed(self._documents):
+                if document_url == url:
+                    return response
+        return None
+
+    def get_status_code(self, url: str) -> Optional[Union[int, str]]:
+        """Return the most critical status code the requested url answered with during the current navigation."""
+        with self._documents_lock:
+            status_codes = [response.status_code for document_url, response in self._documents if document_url == url]
+
+        # Choose the "worst" code of the most critical category: 5xx before 4xx before 3xx before 2xx
+        for category in [5, 4, 3, 2]:
+            category_codes = [code for code in status_codes if code // 100 == category]
+            if category_codes:
+                return max(category_codes)
+
+        # Handle cases where the request URL matches the response URL but no status code was found
+        if url == self.driver.current_url:
+            return "Unknown"
+        return None
+
+    @staticmethod
+    def get_response_body(response) -> bytes:
+        """Return a captured response body with its content encoding removed."""
+        return decode(response.body, response.headers.get("Content-Encoding", "identity"))
+
+    def is_alive(self) -> bool:
+        """Check whether the browser still responds."""
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
     def close_browser(self):
         """Close the browser and clean up resources."""
         self.driver.quit()
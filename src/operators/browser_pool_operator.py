@@ -0,0 +1,170 @@
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+
+from operators.browser_operator import BrowserOperator
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserWorker:
+    """A pool thread, the browser it owns and the page it is working on."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.browser: Optional[BrowserOperator] = None
+        self.task: Optional[Tuple[str, int]] = None
+        self.started_at = 0.0
+        self.abandoned = False
+        # Guards task and abandoned, so a page is reported either by the worker or, once it hung, by the pool
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+
+
+class BrowserPoolOperator:
+    """A pool of headless browser workers sharing one work queue.
+
+    Crashed browsers are replaced and the page they were on is retried once; every page load is bounded by a timeout.
+    A worker stuck on one page for longer than the task timeout is abandoned and replaced, and its page is retried.
+    """
+
+    _BROWSER_MEMORY_BYTES = 512 * 1024 * 1024  # rough footprint of one headless Chrome
+    _MAX_ATTEMPTS = 2
+    _POLL_INTERVAL = 5  # seconds between checks for hung workers while waiting for results
+
+    def __init__(self, size: Optional[int] = None, page_timeout: Optional[int] = None, task_timeout: Optional[int] = None):
+        self.size = size or settings.BROWSER_POOL_SIZE or self.get_default_size()
+        self.page_timeout = page_timeout or settings.BROWSER_PAGE_TIMEOUT
+        self.task_timeout = task_timeout or settings.BROWSER_TASK_TIMEOUT
+
+    @staticmethod
+    def _get_available_memory() -> Optional[int]:
+        """Memory available to new processes in bytes, including reclaimable page cache."""
+        try:
+            with open("/proc/meminfo", "r") as meminfo:
+                for line in meminfo:
+                    if line.startswith("MemAvailable:"):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        try:
+            # Free pages only; undercounts where the page cache is large
+            return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+        except (AttributeError, ValueError, OSError):
+            return None
+
+    @classmethod
+    def get_default_size(cls) -> int:
+        """One browser per core, as far as the available memory allows."""
+        cpu_count = os.cpu_count() or 1
+        available_memory = cls._get_available_memory()
+        if available_memory is None:
+            # Memory is not readable on every platform; leave a core for the rest of the run
+            return max(1, cpu_count - 1)
+        return max(1, min(cpu_count, available_memory // cls._BROWSER_MEMORY_BYTES))
+
+    def _start_browser(self) -> BrowserOperator:
+        return BrowserOperator(page_load_timeout=self.page_timeout)
+
+    @staticmethod
+    def _close_browser(browser: Optional[BrowserOperator]) -> None:
+        if browser is None:
+            return
+        try:
+            browser.close_browser()
+        except Exception as e:
+            logger.warning(f"Failed to close browser: {e}")
+
+    def _work(self, worker: BrowserWorker, work_queue: queue.Queue, result_queue: queue.Queue, fetch: Callable[[BrowserOperator, str], Any]) -> None:
+        try:
+            while not worker.abandoned:
+                try:
+                    url, attempt = work_queue.get_nowait()
+                except queue.Empty:
+                    return
+                with worker.lock:
+                    worker.task, worker.started_at = (url, attempt), time.monotonic()
+                try:
+                    if worker.browser is None:
+                        worker.browser = self._start_browser()
+                    result, error = fetch(worker.browser, url), None
+                except Exception as e:
+                    result, error = None, e
+                    if not worker.abandoned and worker.browser is not None and not worker.browser.is_alive():
+                        logger.warning(f"Browser crashed on {url}; restarting it.")
+                        self._close_browser(worker.browser)
+                        worker.browser = None
+                        if attempt + 1 < self._MAX_ATTEMPTS:
+                            with worker.lock:
+                                worker.task = None
+                            work_queue.put((url, attempt + 1))
+                            continue
+                with worker.lock:
+                    # The pool already reported the page of an abandoned worker
+                    if worker.abandoned:
+                        return
+                    worker.task = None
+                    result_queue.put((url, result, error))
+        finally:
+            if not worker.abandoned:
+                self._close_browser(worker.browser)
+
+    def _start_worker(self, index: int, work_queue: queue.Queue, result_queue: queue.Queue, fetch: Callable[[BrowserOperator, str], Any]) -> BrowserWorker:
+        worker = BrowserWorker(f"browser_{index}")
+        worker.thread = threading.Thread(target=self._work, args=(worker, work_queue, result_queue, fetch), name=worker.name, daemon=True)
+        worker.thread.start()
+        return worker
+
+    def _abandon_hung_workers(self, workers: List[BrowserWorker], work_queue: queue.Queue, result_queue: queue.Queue) -> List[BrowserWorker]:
+        """Abandon the workers stuck on one page past the task timeout, retrying or failing their pages; return them."""
+        hung_workers = []
+        for worker in workers:
+            with worker.lock:
+                if worker.task is None or time.monotonic() - worker.started_at < self.task_timeout:
+                    continue
+                worker.abandoned = True
+                url, attempt = worker.task
+            hung_workers.append(worker)
+            logger.warning(f"{worker.name} has been on {url} for over {self.task_timeout}s; replacing it.")
+            if attempt + 1 < self._MAX_ATTEMPTS:
+                work_queue.put((url, attempt + 1))
+            else:
+                result_queue.put((url, None, TimeoutError(f"No result within {self.task_timeout}s")))
+            # Quitting the driver usually unblocks the stuck call; the thread then exits on its own
+            threading.Thread(target=self._close_browser, args=(worker.browser,), daemon=True).start()
+        return hung_workers
+
+    def run(self, urls: Iterable[str], fetch: Callable[[BrowserOperator, str], Any]) -> Iterator[Tuple[str, Any, Optional[Exception]]]:
+        """Run fetch(browser, url) for every url and yield (url, result, error) as pages complete."""
+        work_queue: queue.Queue = queue.Queue()
+        url_count = 0
+        for url in urls:
+            work_queue.put((url, 0))
+            url_count += 1
+        if not url_count:
+            return
+
+        result_queue: queue.Queue = queue.Queue()
+        worker_count = min(self.size, url_count)
+        logger.info(f"Fetching {url_count} urls with {worker_count} browser workers")
+        workers = [self._start_worker(index, work_queue, result_queue, fetch) for index in range(worker_count)]
+        started_count = worker_count
+        completed_count = 0
+        while completed_count < url_count:
+            try:
+                item = result_queue.get(timeout=self._POLL_INTERVAL)
+            except queue.Empty:
+                for hung_worker in self._abandon_hung_workers(workers, work_queue, result_queue):
+                    workers.remove(hung_worker)
+                    workers.append(self._start_worker(started_count, work_queue, result_queue, fetch))
+                    started_count += 1
+                continue
+            completed_count += 1
+            yield item
+        for worker in workers:
+            worker.thread.join()
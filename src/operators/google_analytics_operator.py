@@ -1,21 +1,32 @@
+import copy
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 
 import pandas as pd
-from googleapiclient.discovery import build
+import requests.exceptions
+from django.conf import settings
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
-from operators.google_auth_operator import GoogleAuthOperator
+from operators.google_service_pool import GoogleServicePool
 
 logger = logging.getLogger(__name__)
 
 
 class GoogleAnalyticsOperator:
+    PAGE_SIZE = 100000  # rows per page, the API allows up to 250000
+    BATCH_SIZE = 5  # reports per batchRunReports request, the API maximum
+
     def __init__(self):
-        self._service = None
+        self._auth_email = None
 
     def set_credentials(self, auth_email: str) -> None:
-        auth_service = GoogleAuthOperator(auth_email)
-        creds = auth_service.authenticate()
-        self._service = build("analyticsdata", "v1beta", credentials=creds)
+        self._auth_email = auth_email
+        GoogleServicePool.get_service(auth_email, "analyticsdata", "v1beta")
+
+    def _get_service(self):
+        # The pool hands out one service per thread, so concurrent pages can share the operator
+        return GoogleServicePool.get_service(self._auth_email, "analyticsdata", "v1beta")
 
     @staticmethod
     def _flatten_data(response: dict) -> pd.DataFrame:
@@ -26,7 +37,7 @@ class GoogleAnalyticsOperator:
 
         # Process each row of data
         data = []
-        for row in response["rows"]:
+        for row in response.get("rows", []):
             # Initialize a list to hold the values for this row
             row_data = []
 
@@ -43,33 +54,78 @@ class GoogleAnalyticsOperator:
         df = pd.DataFrame(data, columns=columns)
         return df
 
+    @staticmethod
+    def build_report_request(start_date, end_date, dimensions, metrics) -> dict:
+        return {
+            "date_ranges": [
+                {
+                    "start_date": start_date.strftime("%Y-%m-%d"),
+                    "end_date": end_date.strftime("%Y-%m-%d"),
+                }
+            ],
+            "dimensions": dimensions,
+            "metrics": metrics,
+        }
+
+    @retry(
+        stop=stop_after_attempt(10),
+        wait=wait_exponential(multiplier=1, max=60),
+        retry=retry_if_exception_type(requests.exceptions.ReadTimeout),
+    )
+    def _run_batch(self, property_id: str, report_requests: List[dict]) -> List[dict]:
+        response = self._get_service().properties().batchRunReports(property=property_id, body={"requests": report_requests}).execute()
+        return response.get("reports", [])
+
+    def _run_pages(self, property_id: str, page_requests: List[dict], max_workers: Optional[int] = None) -> List[dict]:
+        """Run page requests in batchRunReports batches, the batches concurrently, and return the responses in request order."""
+        batches = [page_requests[start : start + self.BATCH_SIZE] for start in range(0, len(page_requests), self.BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=max_workers or settings.GA_MAX_WORKERS, thread_name_prefix="ga") as executor:
+            batch_responses = list(executor.map(lambda batch: self._run_batch(property_id, batch), batches))
+        return [response for responses in batch_responses for response in responses]
+
+    @classmethod
+    def _build_page_request(cls, report_request: dict, offset: int) -> dict:
+        """One page of a report request, ordered by all of its dimensions.
+
+        GA4 does not keep the row order stable between requests; without a total order pages could overlap or skip rows.
+        """
+        page_request = dict(copy.deepcopy(report_request), limit=cls.PAGE_SIZE, offset=offset)
+        if not page_request.get("order_bys"):
+            page_request["order_bys"] = [{"dimension": {"dimension_name": dimension["name"]}} for dimension in page_request.get("dimensions", [])]
+        return page_request
+
+    def fetch_data_batch(self, ga_property_id, report_requests: List[dict], max_workers: Optional[int] = None) -> List[pd.DataFrame]:
+        """Fetch several reports (e.g. date windows or metric groups) of one property, each paginated to completion.
+
+        The first page of every report is requested together; the remaining pages follow concurrently, also batched.
+        """
+        property_id = f"properties/{ga_property_id}"
+        first_page_requests = [self._build_page_request(report_request, 0) for report_request in report_requests]
+        first_pages = self._run_pages(property_id, first_page_requests, max_workers)
+
+        remaining_pages = []
+        for report_index, first_page in enumerate(first_pages):
+            row_count = int(first_page.get("rowCount", 0))
+            for offset in range(self.PAGE_SIZE, row_count, self.PAGE_SIZE):
+                remaining_pages.append((report_index, self._build_page_request(report_requests[report_index], offset)))
+        if remaining_pages:
+            logger.info(f"Fetching {len(remaining_pages)} more GA4 pages for property {ga_property_id}")
+        remaining_responses = self._run_pages(property_id, [page_request for _, page_request in remaining_pages], max_workers)
+
+        pages: List[List[dict]] = [[first_page] for first_page in first_pages]
+        for (report_index, _), response in zip(remaining_pages, remaining_responses):
+            pages[report_index].append(response)
+        return [pd.concat([self._flatten_data(page) for page in report_pages], ignore_index=True) for report_pages in pages]
+
     def fetch_data(self, ga_property_id, start_date, end_date, dimensions, metrics):
         dimension_names = [dim["name"] for dim in dimensions]
         metric_names = [metric["name"] for metric in metrics]
         logger.info(f"Fetching GA4 data for property {ga_property_id} from {start_date} to {end_date} with dimensions {dimension_names} and metrics {metric_names}")
 
-        property_id = f"properties/{ga_property_id}"
-
         try:
-            response = (
-                self._service.properties()
-                .runReport(
-                    property=property_id,
-                    body={
-                        "date_ranges": [
-                            {
-                                "start_date": start_date.strftime("%Y-%m-%d"),
-                                "end_date": end_date.strftime("%Y-%m-%d"),
-                            }
-                        ],
-                        "dimensions": dimensions,
-                        "metrics": metrics,
-                    },
-                )
-                .execute()
-            )
-            logger.info("Data fetched successfully.")
-            df = self._flatten_data(response)
+            report_request = self.build_report_request(start_date, end_date, dimensions, metrics)
+            df = self.fetch_data_batch(ga_property_id, [report_request])[0]
+            logger.info(f"Fetched {len(df)} rows of GA4 data.")
             return df
         except Exception as e:
             logger.error(f"Failed to fetch GA4 data: {e}")
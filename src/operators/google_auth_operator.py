@@ -45,6 +45,12 @@ class GoogleAuthOperator:
 
         return creds
 
+    def refresh(self, creds):
+        """Refresh the credentials in place and store the new token."""
+        logger.info("Refreshing Google auth credentials")
+        creds.refresh(Request())
+        self.__save_credentials(creds, self.token_file_path)
+
     @staticmethod
     def __get_credentials(token_file):
         if os.path.exists(token_file):
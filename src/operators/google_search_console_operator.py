@@ -1,13 +1,17 @@
 import datetime
 import logging
+import re
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import requests.exceptions
-# noinspection PyPackageRequirements
-from googleapiclient.discovery import build
+from django.conf import settings
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
-from operators.google_auth_operator import GoogleAuthOperator
+from operators.google_service_pool import GoogleServicePool
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +24,15 @@ class GoogleSearchConsoleOperator:
     ROW_LIMIT = 25000
 
     def __init__(self):
-        self._service = None
+        self._auth_email = None
 
-    def set_credentials(self, auth_email):
-        auth_service = GoogleAuthOperator(auth_email)
-        creds = auth_service.authenticate()
-        self._service = build("webmasters", "v3", credentials=creds)
+    def set_credentials(self, auth_email) -> None:
+        self._auth_email = auth_email
+        GoogleServicePool.get_service(auth_email, "webmasters", "v3")
+
+    def _get_service(self):
+        # The pool hands out one service per thread, so sharded fetches can share the operator
+        return GoogleServicePool.get_service(self._auth_email, "webmasters", "v3")
 
     @staticmethod
     def _create_request(
@@ -61,7 +68,7 @@ class GoogleSearchConsoleOperator:
     )
     def execute_request(self, site_url, request_body) -> list:
         try:
-            response = self._service.searchanalytics().query(siteUrl=site_url, body=request_body).execute()
+            response = self._get_service().searchanalytics().query(siteUrl=site_url, body=request_body).execute()
             logger.info("Search Analytics query executed successfully.")
             return response.get("rows", [])
         except Exception as e:
@@ -69,25 +76,72 @@ class GoogleSearchConsoleOperator:
             raise GSCFetchError(f"Error while fetching GSC data: {e}")
 
     @staticmethod
-    def _flatten_entry(dimensions, entry):
-        flat_entry = {}
-        for dim, value in zip(dimensions, entry["keys"]):
-            flat_entry[dim] = value
-        flat_entry.update(
-            {
-                "clicks": entry["clicks"],
-                "impressions": entry["impressions"],
-                "ctr": round(entry["ctr"], 2),
-                "position": round(entry["position"], 1),
-            }
-        )
-        return flat_entry
-
-    def fetch_data(self, site_url, start_date: datetime.date, end_date: datetime.date, dimensions, required_columns=None) -> pd.DataFrame:
-        if required_columns is None:
-            required_columns = {"clicks", "impressions", "ctr", "position"}
+    def _new_column_buffers(dimensions) -> Dict[str, Any]:
+        """Typed per-column buffers rows are decoded into, instead of one dict per row."""
+        buffers: Dict[str, Any] = {dim: [] for dim in dimensions}
+        buffers.update({"clicks": array("q"), "impressions": array("q"), "ctr": array("d"), "position": array("d")})
+        return buffers
+
+    @staticmethod
+    def _decode_rows(buffers: Dict[str, Any], dimensions, rows: list) -> None:
+        for index, dim in enumerate(dimensions):
+            buffers[dim].extend(row["keys"][index] for row in rows)
+        buffers["clicks"].extend(int(row["clicks"]) for row in rows)
+        buffers["impressions"].extend(int(row["impressions"]) for row in rows)
+        buffers["ctr"].extend(row["ctr"] for row in rows)
+        buffers["position"].extend(row["position"] for row in rows)
+
+    @staticmethod
+    def _buffers_to_frame(buffers: Dict[str, Any], dimensions, round_metrics: bool) -> pd.DataFrame:
+        data = pd.DataFrame({dim: pd.Series(buffers[dim], dtype="string") for dim in dimensions})
+        data["clicks"] = np.frombuffer(buffers["clicks"], dtype="int64")
+        data["impressions"] = np.frombuffer(buffers["impressions"], dtype="int64")
+        data["ctr"] = np.frombuffer(buffers["ctr"], dtype="float64")
+        data["position"] = np.frombuffer(buffers["position"], dtype="float64")
+        if round_metrics:
+            data["ctr"] = data["ctr"].round(2)
+            data["position"] = data["position"].round(1)
+        return data
+
+    @staticmethod
+    def aggregate_data(data: pd.DataFrame, dimensions: List[str], round_metrics: bool = True) -> pd.DataFrame:
+        """Combine rows sharing the same dimension values, e.g. rows of several days.
 
-        all_data = []
+        Clicks and impressions are summed, ctr is recomputed from them and position is averaged weighted by impressions,
+        so aggregating unrounded rows again gives the same result as aggregating everything at once.
+        """
+        if data.empty:
+            return pd.DataFrame(columns=dimensions + ["clicks", "impressions", "ctr", "position"])
+        weighted = data.assign(position_weight=data["position"] * data["impressions"])
+        aggregated = weighted.groupby(dimensions, as_index=False, sort=False)[["clicks", "impressions", "position_weight"]].sum()
+        aggregated["ctr"] = aggregated["clicks"] / aggregated["impressions"]
+        aggregated["position"] = aggregated["position_weight"] / aggregated["impressions"]
+        aggregated = aggregated.drop(columns=["position_weight"])
+        if round_metrics:
+            aggregated["ctr"] = aggregated["ctr"].round(2)
+            aggregated["position"] = aggregated["position"].round(1)
+        return aggregated
+
+    def stream_data(
+        self,
+        site_url,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        dimensions,
+        on_chunk: Callable[[pd.DataFrame], None],
+        chunk_size: Optional[int] = None,
+        round_metrics=True,
+        dimension_filter_groups=None,
+    ) -> int:
+        """Page through the query, handing every chunk_size decoded rows to on_chunk, and return the number of rows.
+
+        Memory is bounded by the chunk size rather than the size of the result. Raises GSCFetchError when access is
+        denied; chunks handed on before that are an incomplete result.
+        """
+        chunk_size = chunk_size or settings.GSC_CHUNK_SIZE
+        buffers = self._new_column_buffers(dimensions)
+        buffered_rows = 0
+        total_rows = 0
         start_row = 0
 
         while True:
@@ -96,40 +150,142 @@ class GoogleSearchConsoleOperator:
                 end_date.strftime("%Y-%m-%d"),
                 dimensions,
                 start_row,
+                dimension_filter_groups=dimension_filter_groups,
             )
             try:
                 logger.info(f"Fetching GSC data from {start_date} to {end_date} for {site_url}, dimensions {dimensions}, start row {start_row}")
                 data = self.execute_request(site_url, request_body)
             except GSCFetchError as e:
                 logger.error(str(e))
-                # If the error is 'user does not have access', return an empty DataFrame
+                # If the error is 'user does not have access', the range cannot be completed
                 if "HttpError 403" in str(e):
                     logger.error("User does not have access.")
-                    return pd.DataFrame()
+                    raise
                 continue
 
             if not data:
                 break
 
-            flattened_data = [self._flatten_entry(dimensions, entry) for entry in data]
-            all_data.extend(flattened_data)
-
+            self._decode_rows(buffers, dimensions, data)
+            buffered_rows += len(data)
+            total_rows += len(data)
             start_row += len(data)
 
-        logger.info(f"Fetched {len(all_data)} rows of GSC data")
-        df = pd.DataFrame(all_data)
-
-        # Add missing columns with NaN values
-        missing_columns = required_columns - set(df.columns)
-        for column in missing_columns:
-            df[column] = float("NaN")
-
-        # Now, it's safe to cast types because all required columns are present
-        return df.astype(
-            {
-                "clicks": "int64",
-                "impressions": "int64",
-                "ctr": "float64",
-                "position": "float64",
-            }
-        )
+            if buffered_rows >= chunk_size:
+                on_chunk(self._buffers_to_frame(buffers, dimensions, round_metrics))
+                buffers = self._new_column_buffers(dimensions)
+                buffered_rows = 0
+
+        if buffered_rows:
+            on_chunk(self._buffers_to_frame(buffers, dimensions, round_metrics))
+        logger.info(f"Fetched {total_rows} rows of GSC data")
+        return total_rows
+
+    def fetch_data(self, site_url, start_date: datetime.date, end_date: datetime.date, dimensions, required_columns=None, round_metrics=True, dimension_filter_groups=None) -> pd.DataFrame:
+        if required_columns is None:
+            required_columns = {"clicks", "impressions", "ctr", "position"}
+
+        chunks: List[pd.DataFrame] = []
+        try:
+            self.stream_data(site_url, start_date, end_date, dimensions, chunks.append, round_metrics=round_metrics, dimension_filter_groups=dimension_filter_groups)
+        except GSCFetchError:
+            return pd.DataFrame()
+        if chunks:
+            return pd.concat(chunks, ignore_index=True)
+
+        # Empty result: keep the metric columns so callers can rely on them
+        df = pd.DataFrame(columns=sorted(required_columns))
+        return df.astype({"clicks": "int64", "impressions": "int64", "ctr": "float64", "position": "float64"})
+
+    @staticmethod
+    def _split_date_range(start_date: datetime.date, end_date: datetime.date, shard_unit: str) -> List[Tuple[datetime.date, datetime.date]]:
+        if shard_unit == "day":
+            shard_days = 1
+        elif shard_unit == "week":
+            shard_days = 7
+        else:
+            raise ValueError(f"Unsupported shard unit: {shard_unit}")
+        shards = []
+        shard_start = start_date
+        while shard_start <= end_date:
+            shard_end = min(shard_start + datetime.timedelta(days=shard_days - 1), end_date)
+            shards.append((shard_start, shard_end))
+            shard_start = shard_end + datetime.timedelta(days=1)
+        return shards
+
+    @staticmethod
+    def page_prefix_filter_shards(prefixes: List[str]) -> List[list]:
+        """Dimension filter groups for one shard per page prefix plus one for all other pages. Prefixes must not overlap."""
+        shards: List[list] = [[{"filters": [{"dimension": "page", "operator": "includingRegex", "expression": f"^{re.escape(prefix)}"}]}] for prefix in prefixes]
+        other_pages = "|".join(re.escape(prefix) for prefix in prefixes)
+        shards.append([{"filters": [{"dimension": "page", "operator": "excludingRegex", "expression": f"^({other_pages})"}]}])
+        return shards
+
+    def stream_data_sharded(
+        self,
+        site_url,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        dimensions,
+        on_chunk: Callable[[pd.DataFrame], None],
+        shard_unit: str = "day",
+        dimension_filter_shards: Optional[List[list]] = None,
+        max_workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        round_metrics=True,
+    ) -> Tuple[int, List[Tuple[datetime.date, datetime.date, Optional[list]]]]:
+        """Stream the range as date (and optionally dimension filter) shards on a worker pool.
+
+        Shards stay below the per-query row ceiling and paginate in parallel. on_chunk is called from the worker threads.
+
+        :return: The number of rows and the (start date, end date, filter groups) of the shards that failed; rows of
+            failed shards handed to on_chunk are incomplete.
+        """
+        date_shards = self._split_date_range(start_date, end_date, shard_unit)
+        filter_shards = dimension_filter_shards or [None]
+        shards = [(shard_start, shard_end, filter_groups) for shard_start, shard_end in date_shards for filter_groups in filter_shards]
+        logger.info(f"Fetching GSC data from {start_date} to {end_date} for {site_url} in {len(shards)} shards")
+
+        with ThreadPoolExecutor(max_workers=max_workers or settings.GSC_MAX_WORKERS, thread_name_prefix="gsc") as executor:
+            futures = [executor.submit(self.stream_data, site_url, shard_start, shard_end, dimensions, on_chunk, chunk_size, round_metrics, filter_groups) for shard_start, shard_end, filter_groups in shards]
+            total_rows = 0
+            failed_shards = []
+            for shard, future in zip(shards, futures):
+                try:
+                    total_rows += future.result()
+                except GSCFetchError:
+                    failed_shards.append(shard)
+
+        if failed_shards:
+            logger.error(f"{len(failed_shards)} of {len(shards)} GSC shards from {start_date} to {end_date} failed")
+        logger.info(f"Fetched {total_rows} rows of GSC data in {len(shards)} shards")
+        return total_rows, failed_shards
+
+    def fetch_data_sharded(
+        self,
+        site_url,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        dimensions,
+        shard_unit: str = "day",
+        dimension_filter_shards: Optional[List[list]] = None,
+        max_workers: Optional[int] = None,
+        round_metrics=True,
+    ) -> pd.DataFrame:
+        """Fetch the range in shards and merge them into one frame.
+
+        Rows of the same dimension values coming from different date shards are aggregated unless "date" is one of the dimensions.
+        """
+        chunks: List[pd.DataFrame] = []
+        _, failed_shards = self.stream_data_sharded(site_url, start_date, end_date, dimensions, chunks.append, shard_unit, dimension_filter_shards, max_workers, round_metrics=False)
+
+        # Like a single failed query, a partial result is not returned
+        if failed_shards or not chunks:
+            return pd.DataFrame()
+        data = pd.concat(chunks, ignore_index=True)
+        if len(self._split_date_range(start_date, end_date, shard_unit)) > 1 and "date" not in dimensions:
+            return self.aggregate_data(data, dimensions, round_metrics)
+        if round_metrics:
+            data["ctr"] = data["ctr"].round(2)
+            data["position"] = data["position"].round(1)
+        return data
@@ -0,0 +1,90 @@
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Tuple
+
+import requests
+from django.conf import settings
+from googleapiclient import discovery, discovery_cache
+
+from operators.google_auth_operator import GoogleAuthOperator
+
+logger = logging.getLogger(__name__)
+
+
+class GoogleServicePool:
+    """Process-wide authenticated Google API services, keyed by auth email and API.
+
+    Credentials are loaded once per account and refreshed before they expire. Discovery documents are cached on disk, and every
+    thread gets its own service object because service objects are not thread safe.
+    """
+
+    REFRESH_MARGIN = timedelta(minutes=5)
+
+    _credentials: Dict[str, Any] = {}
+    _discovery_documents: Dict[Tuple[str, str], str] = {}
+    _lock = threading.Lock()
+    _local = threading.local()
+
+    @classmethod
+    def get_service(cls, auth_email: str, api: str, version: str) -> Any:
+        credentials = cls._get_credentials(auth_email)
+        services = getattr(cls._local, "services", None)
+        if services is None:
+            services = cls._local.services = {}
+        key = (auth_email, api, version)
+        if key not in services:
+            services[key] = discovery.build_from_document(cls._get_discovery_document(api, version), credentials=credentials)
+        return services[key]
+
+    @classmethod
+    def _expires_soon(cls, credentials: Any) -> bool:
+        if credentials.expiry is None:
+            return False
+        # google-auth keeps expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return credentials.expiry - cls.REFRESH_MARGIN <= now
+
+    @classmethod
+    def _get_credentials(cls, auth_email: str) -> Any:
+        with cls._lock:
+            credentials = cls._credentials.get(auth_email)
+            if credentials is None:
+                credentials = GoogleAuthOperator(auth_email).authenticate()
+                if credentials is None:
+                    raise ValueError(f"No Google credentials available for {auth_email}.")
+                cls._credentials[auth_email] = credentials
+            elif cls._expires_soon(credentials) and credentials.refresh_token:
+                # Services share the credentials object, so refreshing it in place updates all of them
+                GoogleAuthOperator(auth_email).refresh(credentials)
+            return credentials
+
+    @classmethod
+    def _get_discovery_document(cls, api: str, version: str) -> str:
+        key = (api, version)
+        with cls._lock:
+            if key in cls._discovery_documents:
+                return cls._discovery_documents[key]
+
+            document_path = os.path.join(settings.GOOGLE_DISCOVERY_CACHE_DIR, f"{api}.{version}.json")
+            if os.path.exists(document_path):
+                with open(document_path, "r", encoding="utf-8") as file:
+                    document = file.read()
+            else:
+                document = discovery_cache.get_static_doc(api, version) or cls._download_discovery_document(api, version)
+                os.makedirs(settings.GOOGLE_DISCOVERY_CACHE_DIR, exist_ok=True)
+                with open(document_path, "w", encoding="utf-8") as file:
+                    file.write(document)
+                logger.info(f"Cached discovery document for {api} {version} at {document_path}")
+
+            cls._discovery_documents[key] = document
+            return document
+
+    @staticmethod
+    def _download_discovery_document(api: str, version: str) -> str:
+        for discovery_uri in (discovery.V1_DISCOVERY_URI, discovery.V2_DISCOVERY_URI):
+            response = requests.get(discovery_uri.format(api=api, apiVersion=version), timeout=30)
+            if response.ok:
+                return response.text
+        raise ValueError(f"Discovery document for {api} {version} is not available.")
@@ -0,0 +1,59 @@
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Mapping, Optional
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HttpOperator:
+    """Plain HTTP requests used to check whether a page changed before it is rendered again."""
+
+    _local = threading.local()
+
+    def __init__(self, timeout: Optional[int] = None):
+        self.timeout = timeout or settings.HTTP_TIMEOUT
+
+    def _get_session(self) -> requests.Session:
+        # Sessions are not thread safe; every thread keeps its own connection pool
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    @staticmethod
+    def get_validators(headers: Mapping[str, str], content: bytes) -> Dict[str, Optional[str]]:
+        """Collect the cache validators of a response and a hash of its raw body."""
+        return {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "raw_content_hash": hashlib.sha256(content).hexdigest(),
+        }
+
+    def check(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Make a conditional GET request for a url.
+
+        :return: The final url, status code, whether the server answered 304 Not Modified and the response validators,
+            or None when the request failed.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            response = self._get_session().get(url, headers=headers, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Conditional request for {url} failed: {e}")
+            return None
+
+        result = {"url": response.url, "status_code": response.status_code, "not_modified": response.status_code == 304}
+        if result["not_modified"]:
+            # A 304 has no body and may omit validators; the stored ones still apply
+            result.update({"etag": response.headers.get("ETag", etag), "last_modified": response.headers.get("Last-Modified", last_modified), "raw_content_hash": None})
+        else:
+            result.update(self.get_validators(response.headers, response.content))
+        return result
@@ -1,21 +1,97 @@
 import logging
-from typing import List
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
 
 from django.conf import settings
 
 import docker
+from operators.screamingfrog_pool_operator import ScreamingfrogPoolOperator
 
 logger = logging.getLogger(__name__)
 
 
+class CrawlProgress:
+    """Crawl progress parsed from the spider's SpiderProgress log lines."""
+
+    _PROGRESS_PATTERN = re.compile(r"SpiderProgress \[(?P<fields>[^\]]*)\]")
+    _FIELD_PATTERN = re.compile(r"(\w+)=(\d+)")
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.last_progress_at = self.started_at
+        self.urls_crawled = 0
+        self.active = 0
+        self.queue_size = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def urls_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.urls_crawled / elapsed if elapsed else 0.0
+
+    @property
+    def idle_for(self) -> float:
+        """Seconds since the crawl last made progress."""
+        return time.monotonic() - self.last_progress_at
+
+    def update(self, line: str) -> bool:
+        """Update from a log line and return whether it was a progress line."""
+        match = self._PROGRESS_PATTERN.search(line)
+        if not match:
+            # Any other output, such as the export phase after the crawl, also shows the spider is alive
+            self.last_progress_at = time.monotonic()
+            return False
+
+        fields: Dict[str, int] = {}
+        for name, value in self._FIELD_PATTERN.findall(match.group("fields")):
+            # mCompleted appears twice; the first one is the url count, the second the percentage
+            fields.setdefault(name, int(value))
+        urls_crawled = fields.get("mCompleted", self.urls_crawled)
+        if urls_crawled != self.urls_crawled:
+            self.last_progress_at = time.monotonic()
+        self.urls_crawled = urls_crawled
+        self.active = fields.get("mActive", self.active)
+        self.queue_size = fields.get("mWaiting", self.queue_size)
+        return True
+
+    def __str__(self) -> str:
+        return f"{self.urls_crawled} urls crawled, {self.active} active, {self.queue_size} queued, {self.urls_per_second:.1f} urls/s, {self.elapsed:.0f}s elapsed"
+
+
+class ScreamingfrogCrawlError(Exception):
+    pass
+
+
 class ScreamingfrogOperator:
     _crawl_config: str
+    _WATCH_INTERVAL = 5  # seconds between timeout and stall checks
+    _PROGRESS_LOG_INTERVAL = 60  # seconds between progress log lines
+    # Caps the containers running at once across all exports and projects in this process
+    _container_slots = threading.BoundedSemaphore(settings.SCREAMINGFROG_MAX_CONTAINERS)
 
-    def __init__(self, temp_dir: str):
+    def __init__(self, temp_dir: str, cpus: Optional[float] = None, memory: Optional[str] = None, timeout: Optional[int] = None, stall_timeout: Optional[int] = None):
         self.temp_dir = temp_dir
         self.parameters = ["--headless", "--overwrite"]
         self.image = f"{settings.SCREAMINGFROG_IMAGE_NAME}:{settings.SCREAMINGFROG_IMAGE_TAG}"
         self.client = docker.from_env()
+        self.cpus = cpus or settings.SCREAMINGFROG_CONTAINER_CPUS
+        self.memory = memory or settings.SCREAMINGFROG_CONTAINER_MEMORY
+        self.timeout = timeout or settings.SCREAMINGFROG_TIMEOUT
+        self.stall_timeout = stall_timeout or settings.SCREAMINGFROG_STALL_TIMEOUT
+        self._crawl_config = ""
+        self.progress = CrawlProgress()
+        self.exit_code: Optional[int] = None  # of the last run; None when the crawl could not be run
+        self._progress_callbacks: List[Callable[[CrawlProgress], None]] = []
+
+    def add_progress_callback(self, callback: Callable[[CrawlProgress], None]) -> None:
+        """Call back with the crawl progress every time the spider reports it."""
+        self._progress_callbacks.append(callback)
 
     def set_crawl_config(self, seospiderconfig: str) -> None:
         self._crawl_config = seospiderconfig
@@ -34,22 +110,96 @@ class ScreamingfrogOperator:
     def set_crawl_list(self, listfile: str) -> None:
         self.parameters.append(f"--crawl-list {listfile}")
 
+    def _kill(self, container, reason: str) -> None:
+        logger.error(f"{self._crawl_config}: {reason}; killing container {container.short_id}.")
+        try:
+            container.kill()
+        except docker.errors.APIError as e:
+            # The container may have exited in the meantime
+            logger.warning(f"Failed to kill container {container.short_id}: {e}")
+
+    def _watch(self, kill: Callable[[str], None], done: threading.Event) -> None:
+        while not done.wait(self._WATCH_INTERVAL):
+            if self.progress.elapsed > self.timeout:
+                kill(f"crawl exceeded {self.timeout}s")
+                return
+            if self.progress.idle_for > self.stall_timeout:
+                kill(f"no crawl progress for {self.progress.idle_for:.0f}s ({self.progress})")
+                return
+
+    def follow_crawl(self, lines: Iterable[bytes], kill: Callable[[str], None]) -> None:
+        """Follow the crawl's log lines until they end, calling kill when the crawl runs past its timeout or stalls."""
+        self.progress = CrawlProgress()
+        # The log stream ends when the crawl exits, including when the watcher kills it
+        done = threading.Event()
+        watcher = threading.Thread(target=self._watch, args=(kill, done), daemon=True)
+        watcher.start()
+        last_logged_at = 0.0
+        try:
+            for line in lines:
+                text = line.strip().decode(errors="replace")
+                if not self.progress.update(text):
+                    logger.info(f"{self._crawl_config}: {text}")
+                    continue
+                for callback in self._progress_callbacks:
+                    try:
+                        callback(self.progress)
+                    except Exception as e:
+                        logger.warning(f"Crawl progress callback failed: {e}")
+                if self.progress.elapsed - last_logged_at >= self._PROGRESS_LOG_INTERVAL:
+                    logger.info(f"{self._crawl_config}: {self.progress}")
+                    last_logged_at = self.progress.elapsed
+        finally:
+            done.set()
+        logger.info(f"{self._crawl_config}: crawl finished, {self.progress}")
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the last run completed; a killed, failed or unstarted crawl leaves a partial export or none."""
+        return self.exit_code == 0
+
     def run(self) -> None:
-        # volume_mapping = f"{self.temp_dir}:/export"
-        # full_command = f"docker run --rm -v {volume_mapping} -d {self.image} {' '.join(self.parameters)}"
-        # logger.info(f"Executing Docker command: {full_command}")
+        """Run the crawl once a container is available, and wait until it is done."""
+        self.exit_code = None
+        if settings.SCREAMINGFROG_POOL_SIZE:
+            try:
+                self.exit_code = ScreamingfrogPoolOperator.get_pool().run(self.temp_dir, " ".join(self.parameters), self.follow_crawl, self._crawl_config)
+            except Exception as e:
+                logger.error(f"An error occurred while running the crawl in the container pool: {e}")
+            return
+        with self._container_slots:
+            self._run_container()
 
+    def _run_container(self) -> None:
         volumes = {self.temp_dir: {"bind": "/export", "mode": "rw"}}
         parameters = " ".join(self.parameters)
+        container = None
         try:
             container = self.client.containers.run(
                 image=self.image,
                 command=parameters,
                 volumes=volumes,
                 detach=True,
-                auto_remove=True,
+                nano_cpus=int(self.cpus * 1e9),
+                mem_limit=self.memory,
             )
-            for line in container.logs(stream=True):
-                logger.info(f"{self._crawl_config}: {line.strip().decode()}")
+            self.follow_crawl(container.logs(stream=True), lambda reason: self._kill(container, reason))
+            self.exit_code = container.wait().get("StatusCode")
+            if self.exit_code != 0:
+                logger.error(f"{self._crawl_config}: container exited with status {self.exit_code}")
         except Exception as e:
             logger.error(f"An error occurred while running the container: {e}")
+        finally:
+            if container is not None:
+                try:
+                    container.remove(force=True)
+                except docker.errors.APIError as e:
+                    logger.warning(f"Failed to remove container {container.short_id}: {e}")
+
+    @staticmethod
+    def run_concurrently(operators: List["ScreamingfrogOperator"]) -> None:
+        """Run several crawls side by side; the container slots or the warm pool still cap how many run at once."""
+        if not operators:
+            return
+        with ThreadPoolExecutor(max_workers=len(operators)) as executor:
+            list(executor.map(lambda operator: operator.run(), operators))
@@ -0,0 +1,198 @@
+import atexit
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+
+import docker
+
+logger = logging.getLogger(__name__)
+
+
+class WarmContainer:
+    """A Screaming Frog container kept running between crawls, with the host directory mounted at /export."""
+
+    def __init__(self, container, work_dir: str):
+        self.container = container
+        self.work_dir = work_dir
+        self.job_count = 0
+
+
+class ScreamingfrogPoolOperator:
+    """A pool of long-lived Screaming Frog containers that run crawls through docker exec.
+
+    Every crawl takes a container to itself: its input files are copied into the container's /export mount, the spider
+    runs there and the exported files are moved back to the crawl's temp directory. Containers are health-checked
+    before each crawl and replaced after max_jobs crawls.
+    """
+
+    _SPIDER_BINARY = "/usr/bin/screamingfrogseospider"
+    _pool: Optional["ScreamingfrogPoolOperator"] = None
+    _pool_lock = threading.Lock()
+
+    def __init__(self, size: int, max_jobs: int):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.image = f"{settings.SCREAMINGFROG_IMAGE_NAME}:{settings.SCREAMINGFROG_IMAGE_TAG}"
+        self.client = docker.from_env()
+        self.work_root = os.path.join(settings.CACHE_DIR, "screamingfrog_pool")
+        os.makedirs(self.work_root, exist_ok=True)
+
+        self._idle: List[WarmContainer] = []
+        self._started_count = 0
+        # Signalled whenever a container becomes idle or a slot for a new one frees up
+        self._condition = threading.Condition()
+
+    @classmethod
+    def get_pool(cls) -> "ScreamingfrogPoolOperator":
+        """The pool shared by all crawls of the process, started lazily and stopped at exit."""
+        with cls._pool_lock:
+            if cls._pool is None:
+                cls._pool = cls(settings.SCREAMINGFROG_POOL_SIZE, settings.SCREAMINGFROG_POOL_MAX_JOBS)
+                atexit.register(cls._pool.close)
+            return cls._pool
+
+    def _start_container(self) -> WarmContainer:
+        work_dir = tempfile.mkdtemp(prefix="container_", dir=self.work_root)
+        container = self.client.containers.run(
+            image=self.image,
+            entrypoint=["sleep", "infinity"],
+            volumes={work_dir: {"bind": "/export", "mode": "rw"}},
+            detach=True,
+            nano_cpus=int(settings.SCREAMINGFROG_CONTAINER_CPUS * 1e9),
+            mem_limit=settings.SCREAMINGFROG_CONTAINER_MEMORY,
+        )
+        logger.info(f"Started warm Screaming Frog container {container.short_id}")
+        return WarmContainer(container, work_dir)
+
+    def _remove_container(self, warm_container: WarmContainer) -> None:
+        try:
+            warm_container.container.remove(force=True)
+        except docker.errors.APIError as e:
+            logger.warning(f"Failed to remove container {warm_container.container.short_id}: {e}")
+        shutil.rmtree(warm_container.work_dir, ignore_errors=True)
+
+    @staticmethod
+    def _is_healthy(warm_container: WarmContainer) -> bool:
+        try:
+            warm_container.container.reload()
+        except docker.errors.APIError:
+            return False
+        return warm_container.container.status == "running"
+
+    def _acquire(self) -> WarmContainer:
+        """Take an idle healthy container, starting one while the pool is below its size."""
+        while True:
+            with self._condition:
+                while not self._idle and self._started_count >= self.size:
+                    self._condition.wait()
+                if self._idle:
+                    warm_container = self._idle.pop()
+                else:
+                    warm_container = None
+                    self._started_count += 1
+
+            if warm_container is None:
+                try:
+                    return self._start_container()
+                except Exception:
+                    self._free_slot()
+                    raise
+            if self._is_healthy(warm_container):
+                return warm_container
+            logger.warning(f"Warm container {warm_container.container.short_id} is unhealthy; replacing it.")
+            self._discard(warm_container)
+
+    def _free_slot(self) -> None:
+        with self._condition:
+            self._started_count -= 1
+            self._condition.notify()
+
+    def _discard(self, warm_container: WarmContainer) -> None:
+        self._remove_container(warm_container)
+        self._free_slot()
+
+    def _release(self, warm_container: WarmContainer) -> None:
+        warm_container.job_count += 1
+        if warm_container.job_count >= self.max_jobs:
+            logger.info(f"Recycling warm container {warm_container.container.short_id} after {warm_container.job_count} crawls")
+            self._discard(warm_container)
+            return
+        with self._condition:
+            self._idle.append(warm_container)
+            self._condition.notify()
+
+    @staticmethod
+    def _transfer_files(source_dir: str, target_dir: str, copy: bool = False) -> None:
+        for filename in os.listdir(source_dir):
+            source_path = os.path.join(source_dir, filename)
+            target_path = os.path.join(target_dir, filename)
+            if os.path.isdir(source_path):
+                continue
+            if copy:
+                shutil.copy2(source_path, target_path)
+            else:
+                shutil.move(source_path, target_path)
+
+    @staticmethod
+    def _iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Split the exec output stream, which arrives in arbitrary chunks, into lines."""
+        pending = b""
+        for chunk in chunks:
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            yield from lines
+        if pending:
+            yield pending
+
+    def _kill(self, warm_container: WarmContainer, label: str, reason: str) -> None:
+        # The spider runs as an exec'd process; killing the container is the reliable way to stop it
+        logger.error(f"{label}: {reason}; killing container {warm_container.container.short_id}.")
+        try:
+            warm_container.container.kill()
+        except docker.errors.APIError as e:
+            logger.warning(f"Failed to kill container {warm_container.container.short_id}: {e}")
+
+    def run(self, temp_dir: str, parameters: str, follow: Callable[[Iterable[bytes], Callable[[str], None]], None], label: str = "") -> Optional[int]:
+        """
+        Run one crawl in a warm container.
+
+        :param temp_dir: The crawl's temp directory; its files are the crawl input and receive the crawl output.
+        :param parameters: The spider command line arguments.
+        :param follow: Consumes the crawl's log lines, calling the given kill function to stop the crawl.
+        :return: The spider's exit code, or None when the crawl could not be run.
+        """
+        warm_container = self._acquire()
+        exit_code = None
+        try:
+            self._transfer_files(temp_dir, warm_container.work_dir, copy=True)
+            exec_id = self.client.api.exec_create(warm_container.container.id, f"{self._SPIDER_BINARY} {parameters}", workdir="/export")["Id"]
+            output = self.client.api.exec_start(exec_id, stream=True)
+            follow(self._iter_lines(output), lambda reason: self._kill(warm_container, label, reason))
+            exit_code = self.client.api.exec_inspect(exec_id).get("ExitCode")
+            if exit_code != 0:
+                logger.error(f"{label}: crawl exited with status {exit_code}")
+            self._transfer_files(warm_container.work_dir, temp_dir)
+        except Exception as e:
+            logger.error(f"An error occurred while running the crawl in container {warm_container.container.short_id}: {e}")
+        finally:
+            # Leave an empty mount for the next crawl
+            for filename in os.listdir(warm_container.work_dir):
+                path = os.path.join(warm_container.work_dir, filename)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+            self._release(warm_container)
+        return exit_code
+
+    def close(self) -> None:
+        """Remove the idle containers of the pool."""
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for warm_container in idle:
+            self._discard(warm_container)
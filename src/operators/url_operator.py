@@ -0,0 +1,71 @@
+import logging
+from functools import lru_cache
+from typing import Any, Callable
+from urllib.parse import ParseResult, urljoin, urlparse, urlunparse
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class UrlOperator:
+    """Url parsing over whole pandas Series.
+
+    Each distinct url is handled once: the Series is factorized, the function runs over the unique values and the
+    results are spread back with the factorization codes. Parsing itself is memoized across calls.
+    """
+
+    _DEFAULT_PORTS = {"http": 80, "https": 443}
+
+    @staticmethod
+    @lru_cache(maxsize=1_000_000)
+    def parse(url: str) -> ParseResult:
+        return urlparse(url)
+
+    @staticmethod
+    def _map_unique(urls: pd.Series, function: Callable[[str], Any], dtype: str, na_value: Any = pd.NA) -> pd.Series:
+        """Apply function to every distinct value of urls; missing values map to na_value."""
+        codes, uniques = pd.factorize(urls)
+        values = pd.array([function(url) for url in uniques] + [na_value], dtype=dtype)
+        # Missing values have code -1; point them at the trailing na_value
+        codes = np.where(codes < 0, len(uniques), codes)
+        return pd.Series(values.take(codes), index=urls.index, name=urls.name)
+
+    @classmethod
+    def is_fragmented(cls, urls: pd.Series) -> pd.Series:
+        """Whether each url has a #fragment."""
+        return cls._map_unique(urls, lambda url: bool(cls.parse(url).fragment), "bool", na_value=False)
+
+    @classmethod
+    def get_full_address(cls, root_url: str, paths: pd.Series) -> pd.Series:
+        """Join each path against the root url."""
+        return cls._map_unique(paths, lambda path: urljoin(root_url, path), "string")
+
+    @classmethod
+    def host(cls, urls: pd.Series) -> pd.Series:
+        return cls._map_unique(urls, lambda url: cls.parse(url).hostname, "string")
+
+    @classmethod
+    def path(cls, urls: pd.Series) -> pd.Series:
+        return cls._map_unique(urls, lambda url: cls.parse(url).path, "string")
+
+    @classmethod
+    def normalize_url(cls, url: str) -> str:
+        """Lowercase the scheme and host, drop default ports and the fragment, and give empty paths a '/'."""
+        parsed = cls.parse(url)
+        scheme = parsed.scheme.lower()
+        netloc = (parsed.hostname or "").lower()
+        try:
+            port = parsed.port
+        except ValueError:
+            port = None
+        if port and port != cls._DEFAULT_PORTS.get(scheme):
+            netloc = f"{netloc}:{port}"
+        if parsed.username or parsed.password:
+            netloc = f"{parsed.netloc.rsplit('@', 1)[0]}@{netloc}"
+        return urlunparse((scheme, netloc, parsed.path or "/", parsed.params, parsed.query, ""))
+
+    @classmethod
+    def normalize(cls, urls: pd.Series) -> pd.Series:
+        return cls._map_unique(urls, cls.normalize_url, "string")